@@ -4,6 +4,7 @@ from .models import (
     Advertisement,
     AdvertisementCategory,
     AdvertisementImages,
+    AdvertisementImageVariant,
     City,
     ModerationRecordHistory,
     Region,
@@ -39,6 +40,18 @@ class AdvertisementImagesAdmin(admin.ModelAdmin):
     list_filter = ("advertisement",)
 
 
+@admin.register(AdvertisementImageVariant)
+class AdvertisementImageVariantAdmin(admin.ModelAdmin):
+    """Class for advertisement image variants admin."""
+
+    search_fields = ("kind",)
+    list_display = (
+        "image",
+        "kind",
+    )
+    list_filter = ("kind",)
+
+
 @admin.register(ModerationRecordHistory)
 class ModerationRecordHistoryAdmin(admin.ModelAdmin):
     """Class for moderation record history admin."""
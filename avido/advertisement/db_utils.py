@@ -0,0 +1,245 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import (
+    Case,
+    Count,
+    IntegerField,
+    Prefetch,
+    Q,
+    QuerySet,
+    When,
+)
+
+from advertisement.enums import ImageVariantKind
+from advertisement.models import (
+    AdvertisementCategory,
+    AdvertisementImages,
+    AdvertisementImageVariant,
+    City,
+)
+
+CATEGORY_TREE_CACHE_KEY = "advertisement:category_tree"
+NAMED_RELATIONS = {"category": ("name",), "city": ("name",)}
+FACETS = ("city", "category", "price")
+FACET_MODELS = {"city": City, "category": AdvertisementCategory}
+FACET_SIZE = 20
+PRICE_RANGES = (
+    (None, 1000),
+    (1000, 5000),
+    (5000, 20000),
+    (20000, 100000),
+    (100000, None),
+)
+
+
+def filter_in_order(queryset: QuerySet, ids: list) -> QuerySet:
+    """Restricts the queryset to `ids` keeping the order of the list."""
+
+    if not ids:
+        return queryset.none()
+
+    return queryset.filter(pk__in=ids).order_by(
+        Case(
+            *[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+            output_field=IntegerField(),
+        )
+    )
+
+
+def narrow_to_fields(
+    queryset: QuerySet, fields, keep=(), related: dict | None = None
+) -> QuerySet:
+    """
+    Loads only the columns shown by the requested serializer fields
+    and the ones in `keep`. `related` maps relation fields to the columns
+    shown of them, only requested relations are joined.
+    """
+
+    related = {
+        name: columns
+        for name, columns in (related or {}).items()
+        if name in fields
+    }
+    columns = {field.name for field in queryset.model._meta.concrete_fields}
+
+    if related:
+        queryset = queryset.select_related(*related)
+
+    return queryset.only(
+        *keep,
+        *(name for name in fields if name in columns and name not in related),
+        *(
+            f"{name}__{column}"
+            for name, related_columns in related.items()
+            for column in related_columns
+        ),
+    )
+
+
+def prefetch_for_list(queryset: QuerySet, fields=None) -> QuerySet:
+    """
+    Joins the relations shown in advertisement lists
+    and prefetches only the first image of every advertisement
+    with its card variant, so a page costs a constant number of queries.
+    With `fields` only what these serializer fields show is loaded.
+    """
+
+    if fields is None:
+        queryset = queryset.select_related("category", "city")
+    else:
+        queryset = narrow_to_fields(
+            queryset,
+            fields,
+            keep=("created_at", "price"),
+            related=NAMED_RELATIONS,
+        )
+
+    if fields is not None and "image" not in fields:
+        return queryset
+
+    return queryset.prefetch_related(
+        Prefetch(
+            "images",
+            queryset=AdvertisementImages.objects.order_by(
+                "pk"
+            ).prefetch_related(
+                Prefetch(
+                    "variants",
+                    queryset=AdvertisementImageVariant.objects.filter(
+                        kind=ImageVariantKind.CARD.value
+                    ),
+                    to_attr="card_variants",
+                )
+            )[
+                :1
+            ],
+            to_attr="first_images",
+        )
+    )
+
+
+def select_for_detail(queryset: QuerySet, fields, user_fields) -> QuerySet:
+    """
+    Narrows an advertisement detail query to the serializer fields,
+    keeping what the view itself reads.
+    Shown images are prefetched with all their variants.
+    """
+
+    queryset = narrow_to_fields(
+        queryset,
+        fields,
+        keep=("user", "updated_at", "views"),
+        related={**NAMED_RELATIONS, "user": user_fields},
+    )
+
+    if "images" not in fields:
+        return queryset
+
+    return queryset.prefetch_related(
+        Prefetch(
+            "images",
+            queryset=AdvertisementImages.objects.order_by(
+                "pk"
+            ).prefetch_related("variants"),
+        )
+    )
+
+
+def build_category_tree() -> list[dict]:
+    """Loads all categories in one query and assembles the tree in memory."""
+
+    children = defaultdict(list)
+
+    for pk, name, parent_id in AdvertisementCategory.objects.order_by(
+        "pk"
+    ).values_list("pk", "name", "parent_category_id"):
+        children[parent_id].append((pk, name))
+
+    def get_children(parent_id):
+        return [
+            {"id": pk, "name": name, "children": get_children(pk)}
+            for pk, name in children[parent_id]
+        ]
+
+    return [
+        {"name": name, "children": get_children(pk)}
+        for pk, name in children[None]
+    ]
+
+
+def get_category_tree() -> list[dict]:
+    """Category tree, built once and kept in cache until a category changes."""
+
+    return cache.get_or_set(
+        CATEGORY_TREE_CACHE_KEY, build_category_tree, timeout=None
+    )
+
+
+def invalidate_category_tree() -> None:
+    """Drops the cached category tree."""
+
+    cache.delete(CATEGORY_TREE_CACHE_KEY)
+
+
+def count_facets(queryset: QuerySet, facets) -> dict:
+    """
+    Advertisements per city, per category and per price range,
+    counted with one `GROUP BY` query per facet.
+    """
+
+    queryset = queryset.order_by().prefetch_related(None)
+    counts = {}
+
+    for facet in facets:
+        if facet == "price":
+            counts[facet] = count_price_ranges(queryset)
+            continue
+
+        counts[facet] = [
+            {"id": pk, "name": name, "count": count}
+            for pk, name, count in queryset.values(
+                f"{facet}_id", f"{facet}__name"
+            )
+            .annotate(count=Count("pk"))
+            .order_by("-count", f"{facet}_id")
+            .values_list(f"{facet}_id", f"{facet}__name", "count")[:FACET_SIZE]
+        ]
+
+    return counts
+
+
+def count_price_ranges(queryset: QuerySet) -> list[dict]:
+    """Counts of all `PRICE_RANGES` in a single query."""
+
+    counts = queryset.aggregate(
+        **{
+            f"range_{position}": Count(
+                "pk",
+                filter=Q(
+                    **{
+                        lookup: value
+                        for lookup, value in (
+                            ("price__gte", low),
+                            ("price__lt", high),
+                        )
+                        if value is not None
+                    }
+                ),
+            )
+            for position, (low, high) in enumerate(PRICE_RANGES)
+        }
+    )
+
+    return [
+        {"from": low, "to": high, "count": counts[f"range_{position}"]}
+        for position, (low, high) in enumerate(PRICE_RANGES)
+    ]
+
+
+def get_facet_names(facet: str, ids) -> dict:
+    """Names of the cities or categories of a facet by id."""
+
+    return dict(
+        FACET_MODELS[facet].objects.filter(pk__in=ids).values_list("pk", "name")
+    )
@@ -16,3 +16,11 @@ class ModerationDecision(Enum):
 
     PUBLISH: str = "publish"
     SEND_FOR_REVISION: str = "send_for_revision"
+
+
+class ImageVariantKind(Enum):
+    """Enum for resized copies of advertisement images."""
+
+    CARD: str = "card"
+    DETAIL: str = "detail"
+    ZOOM: str = "zoom"
@@ -1,18 +1,19 @@
 from django_filters import rest_framework as filters
 
-from advertisement.models import Advertisement
+from advertisement.models import Advertisement, AdvertisementCategory, City
 
 
 class AdvertisementFilter(filters.FilterSet):
-    """Advertisement Filter Set."""
+    """
+    Advertisement Filter Set.
+    Filters are turned into plain lookups on advertisement columns,
+    see `get_lookups`, so search backends can apply them as well.
+    """
 
     price = filters.RangeFilter()
-    city = filters.CharFilter(
-        field_name="city_name__name", lookup_expr="icontains"
-    )
-    category = filters.CharFilter(
-        field_name="category__name", lookup_expr="icontains"
-    )
+    city = filters.CharFilter()
+    category = filters.CharFilter()
+    category_id = filters.NumberFilter()
 
     class Meta:
         model = Advertisement
@@ -20,6 +21,86 @@ class AdvertisementFilter(filters.FilterSet):
             "price",
             "city",
             "category",
-            "name",
-            "description",
+            "category_id",
+        )
+
+    def filter_queryset(self, queryset):
+        return queryset.filter(**self.get_lookups())
+
+    def get_lookups(self) -> dict:
+        """
+        `price__gte`, `price__lte`, `city_id__in` and `category_id__in`
+        lookups of the valid filters.
+        City and category names are resolved to ids once,
+        matching by the trigram index, a category id covers its subtree.
+        """
+
+        data = self.form.cleaned_data
+        lookups = {}
+        price = data.get("price")
+
+        if price is not None and price.start is not None:
+            lookups["price__gte"] = price.start
+
+        if price is not None and price.stop is not None:
+            lookups["price__lte"] = price.stop
+
+        if data.get("city"):
+            lookups["city_id__in"] = list(
+                City.objects.filter(name__icontains=data["city"]).values_list(
+                    "pk", flat=True
+                )
+            )
+
+        for category_ids in (
+            self.get_category_ids(data.get("category")),
+            self.get_subtree_ids(data.get("category_id")),
+        ):
+            if category_ids is None:
+                continue
+
+            if "category_id__in" in lookups:
+                category_ids = [
+                    pk
+                    for pk in category_ids
+                    if pk in lookups["category_id__in"]
+                ]
+
+            lookups["category_id__in"] = category_ids
+
+        return lookups
+
+    @staticmethod
+    def get_category_ids(name: str | None) -> list[int] | None:
+        """Ids of the categories with the name, same as for cities."""
+
+        if not name:
+            return None
+
+        return list(
+            AdvertisementCategory.objects.filter(
+                name__icontains=name
+            ).values_list("pk", flat=True)
+        )
+
+    @staticmethod
+    def get_subtree_ids(category_id) -> list[int] | None:
+        """Ids of the category and of all its subcategories."""
+
+        if category_id is None:
+            return None
+
+        path = (
+            AdvertisementCategory.objects.filter(pk=category_id)
+            .values_list("path", flat=True)
+            .first()
+        )
+
+        if path is None:
+            return []
+
+        return list(
+            AdvertisementCategory.objects.filter(
+                path__startswith=path
+            ).values_list("pk", flat=True)
         )
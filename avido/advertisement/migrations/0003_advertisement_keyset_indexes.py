@@ -0,0 +1,27 @@
+# Generated by Django 5.0.4 on 2026-10-17 10:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("advertisement", "0002_alter_advertisementimages_image"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="advertisement",
+            index=models.Index(
+                fields=["created_at", "id"], name="advertisement_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="advertisement",
+            index=models.Index(
+                fields=["price", "id"], name="advertisement_price_id_idx"
+            ),
+        ),
+    ]
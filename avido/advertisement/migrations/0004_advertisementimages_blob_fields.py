@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("advertisement", "0003_advertisement_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="advertisementimages",
+            name="image",
+            field=models.BinaryField(null=True, verbose_name="Image"),
+        ),
+        migrations.AddField(
+            model_name="advertisementimages",
+            name="key",
+            field=models.CharField(
+                default="", max_length=64, verbose_name="Key"
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="advertisementimages",
+            name="size",
+            field=models.PositiveIntegerField(default=0, verbose_name="Size"),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="advertisementimages",
+            name="width",
+            field=models.PositiveIntegerField(
+                blank=True, null=True, verbose_name="Width"
+            ),
+        ),
+        migrations.AddField(
+            model_name="advertisementimages",
+            name="height",
+            field=models.PositiveIntegerField(
+                blank=True, null=True, verbose_name="Height"
+            ),
+        ),
+    ]
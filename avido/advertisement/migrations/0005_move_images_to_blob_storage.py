@@ -0,0 +1,61 @@
+from django.db import migrations
+
+from api.services.blob_storage import get_blob_storage
+
+BATCH_SIZE = 200
+
+
+def move_images_to_blob_storage(apps, schema_editor):
+    """Copies image bytes to the blob storage batch by batch."""
+
+    AdvertisementImages = apps.get_model("advertisement", "AdvertisementImages")
+    storage = get_blob_storage()
+    last_pk = 0
+
+    while batch := list(
+        AdvertisementImages.objects.filter(pk__gt=last_pk, key="").order_by(
+            "pk"
+        )[:BATCH_SIZE]
+    ):
+        for image in batch:
+            image.key, image.size, image.width, image.height = storage.save(
+                bytes(image.image)
+            )
+
+        AdvertisementImages.objects.bulk_update(
+            batch, ("key", "size", "width", "height")
+        )
+        last_pk = batch[-1].pk
+
+
+def move_images_to_database(apps, schema_editor):
+    """Reads image bytes back from the blob storage."""
+
+    AdvertisementImages = apps.get_model("advertisement", "AdvertisementImages")
+    storage = get_blob_storage()
+    last_pk = 0
+
+    while batch := list(
+        AdvertisementImages.objects.filter(pk__gt=last_pk)
+        .exclude(key="")
+        .order_by("pk")[:BATCH_SIZE]
+    ):
+        for image in batch:
+            image.image = storage.read(image.key)
+
+        AdvertisementImages.objects.bulk_update(batch, ("image",))
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("advertisement", "0004_advertisementimages_blob_fields"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            move_images_to_blob_storage, move_images_to_database
+        ),
+    ]
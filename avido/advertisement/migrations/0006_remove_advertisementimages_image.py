@@ -0,0 +1,14 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("advertisement", "0005_move_images_to_blob_storage"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="advertisementimages",
+            name="image",
+        ),
+    ]
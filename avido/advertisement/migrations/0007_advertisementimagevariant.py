@@ -0,0 +1,62 @@
+# Generated by Django 5.0.4 on 2026-10-17 10:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("advertisement", "0006_remove_advertisementimages_image"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AdvertisementImageVariant",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("card", "CARD"),
+                            ("detail", "DETAIL"),
+                            ("zoom", "ZOOM"),
+                        ],
+                        max_length=30,
+                        verbose_name="Kind",
+                    ),
+                ),
+                ("key", models.CharField(max_length=64, verbose_name="Key")),
+                ("size", models.PositiveIntegerField(verbose_name="Size")),
+                ("width", models.PositiveIntegerField(verbose_name="Width")),
+                ("height", models.PositiveIntegerField(verbose_name="Height")),
+                (
+                    "image",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="variants",
+                        to="advertisement.advertisementimages",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Вариант изображения",
+                "verbose_name_plural": "Варианты изображений",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="advertisementimagevariant",
+            constraint=models.UniqueConstraint(
+                fields=("image", "kind"), name="unique_image_variant_kind"
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.4 on 2026-10-17 10:51
+
+from django.db import migrations, models
+
+
+def fill_category_paths(apps, schema_editor):
+    """Computes materialized paths of existing categories top down."""
+
+    AdvertisementCategory = apps.get_model(
+        "advertisement", "AdvertisementCategory"
+    )
+    paths = {None: "/"}
+    level = list(AdvertisementCategory.objects.filter(parent_category=None))
+
+    while level:
+        for category in level:
+            category.path = (
+                f"{paths[category.parent_category_id]}{category.pk}/"
+            )
+            paths[category.pk] = category.path
+
+        AdvertisementCategory.objects.bulk_update(level, ("path",))
+        level = list(
+            AdvertisementCategory.objects.filter(
+                parent_category__in=[category.pk for category in level]
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("advertisement", "0007_advertisementimagevariant"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="advertisementcategory",
+            name="path",
+            field=models.CharField(
+                default="", editable=False, max_length=255, verbose_name="Path"
+            ),
+        ),
+        migrations.RunPython(fill_category_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="advertisementcategory",
+            index=models.Index(
+                fields=["path"],
+                name="category_path_idx",
+                opclasses=("varchar_pattern_ops",),
+            ),
+        ),
+    ]
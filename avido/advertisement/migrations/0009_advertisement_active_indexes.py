@@ -0,0 +1,49 @@
+# Generated by Django 5.0.4 on 2026-10-17 10:52
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("advertisement", "0008_advertisementcategory_path"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="advertisement",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["created_at", "id"],
+                name="active_created_id_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="advertisement",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["price", "id"],
+                name="active_price_id_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="advertisement",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["city", "created_at", "id"],
+                name="active_city_created_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="advertisement",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["category", "created_at", "id"],
+                name="active_category_created_idx",
+            ),
+        ),
+    ]
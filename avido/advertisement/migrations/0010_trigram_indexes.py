@@ -0,0 +1,54 @@
+# Generated by Django 5.0.4 on 2026-10-17 10:56
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    TrigramExtension,
+)
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("advertisement", "0009_advertisement_active_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="advertisement",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"],
+                name="advertisement_name_trgm_idx",
+                opclasses=("gin_trgm_ops",),
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="advertisement",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["description"],
+                name="advertisement_desc_trgm_idx",
+                opclasses=("gin_trgm_ops",),
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="advertisementcategory",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"],
+                name="category_name_trgm_idx",
+                opclasses=("gin_trgm_ops",),
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="city",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"],
+                name="city_name_trgm_idx",
+                opclasses=("gin_trgm_ops",),
+            ),
+        ),
+    ]
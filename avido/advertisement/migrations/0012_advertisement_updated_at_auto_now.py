@@ -0,0 +1,20 @@
+# Generated by Django 5.0.4 on 2026-10-17 11:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("advertisement", "0011_advertisement_search_vector"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="advertisement",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, verbose_name="Updated at"
+            ),
+        ),
+    ]
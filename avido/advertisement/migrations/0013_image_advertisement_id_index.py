@@ -0,0 +1,22 @@
+# Generated by Django 5.0.4 on 2026-10-17 11:20
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("advertisement", "0012_advertisement_updated_at_auto_now"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="advertisementimages",
+            index=models.Index(
+                fields=["advertisement", "id"],
+                name="image_advertisement_id_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-17 12:01
+
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("advertisement", "0013_image_advertisement_id_index"),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name="advertisement",
+            name="advertisement_created_id_idx",
+        ),
+        RemoveIndexConcurrently(
+            model_name="advertisement",
+            name="advertisement_price_id_idx",
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.4 on 2026-10-17 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("advertisement", "0014_drop_full_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ViewsBatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        max_length=32, unique=True, verbose_name="Key"
+                    ),
+                ),
+                (
+                    "flushed_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Flushed At"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Пакет просмотров",
+                "verbose_name_plural": "Пакеты просмотров",
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.4 on 2026-10-17 12:43
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("advertisement", "0015_viewsbatch"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="advertisement",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector(
+                    "name", config="simple"
+                ),
+                condition=models.Q(("status", "active")),
+                name="active_name_words_idx",
+            ),
+        ),
+    ]
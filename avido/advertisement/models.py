@@ -1,9 +1,13 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
 from django.utils.translation import gettext_lazy as _
 
 from users.models import User
 
-from .enums import AdvertisementStatus, ModerationDecision
+from .enums import AdvertisementStatus, ImageVariantKind, ModerationDecision
 
 
 class AdvertisementCategory(models.Model):
@@ -22,6 +26,9 @@ class AdvertisementCategory(models.Model):
     sort_order = models.IntegerField(
         _("Sort Order"), choices=[(0, "ASC"), (1, "DESC")], default=0
     )
+    path = models.CharField(
+        _("Path"), max_length=255, default="", editable=False
+    )
 
     def __str__(self):
         return self.name
@@ -29,6 +36,48 @@ class AdvertisementCategory(models.Model):
     class Meta:
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
+        indexes = (
+            models.Index(
+                fields=("path",),
+                name="category_path_idx",
+                opclasses=("varchar_pattern_ops",),
+            ),
+            GinIndex(
+                fields=("name",),
+                name="category_name_trgm_idx",
+                opclasses=("gin_trgm_ops",),
+            ),
+        )
+
+    def save(self, *args, **kwargs):
+        """
+        Keeps the materialized path `/<root id>/.../<own id>/` up to date.
+        When a category moves, the paths of its whole subtree
+        are rewritten with a single update.
+        """
+
+        super().save(*args, **kwargs)
+
+        parent_path = (
+            AdvertisementCategory.objects.filter(pk=self.parent_category_id)
+            .values_list("path", flat=True)
+            .first()
+            or "/"
+        )
+        path = f"{parent_path}{self.pk}/"
+
+        if path == self.path:
+            return
+
+        old_path, self.path = self.path, path
+        AdvertisementCategory.objects.filter(pk=self.pk).update(path=path)
+
+        if old_path:
+            AdvertisementCategory.objects.filter(
+                path__startswith=old_path
+            ).exclude(pk=self.pk).update(
+                path=Concat(Value(path), Substr("path", len(old_path) + 1))
+            )
 
 
 class Advertisement(models.Model):
@@ -45,7 +94,7 @@ class Advertisement(models.Model):
         max_length=30,
     )
     created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
-    updated_at = models.DateTimeField(_("Updated at"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
     category = models.ForeignKey(
         AdvertisementCategory,
         on_delete=models.CASCADE,
@@ -61,10 +110,56 @@ class Advertisement(models.Model):
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="advertisements"
     )
+    search_vector = models.GeneratedField(
+        expression=SearchVector("name", weight="A", config="russian")
+        + SearchVector("description", weight="B", config="russian"),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         verbose_name = "Объявление"
         verbose_name_plural = "Объявления"
+        indexes = (
+            models.Index(
+                fields=("created_at", "id"),
+                name="active_created_id_idx",
+                condition=models.Q(status=AdvertisementStatus.ACTIVE.value),
+            ),
+            models.Index(
+                fields=("price", "id"),
+                name="active_price_id_idx",
+                condition=models.Q(status=AdvertisementStatus.ACTIVE.value),
+            ),
+            models.Index(
+                fields=("city", "created_at", "id"),
+                name="active_city_created_idx",
+                condition=models.Q(status=AdvertisementStatus.ACTIVE.value),
+            ),
+            models.Index(
+                fields=("category", "created_at", "id"),
+                name="active_category_created_idx",
+                condition=models.Q(status=AdvertisementStatus.ACTIVE.value),
+            ),
+            GinIndex(
+                fields=("name",),
+                name="advertisement_name_trgm_idx",
+                opclasses=("gin_trgm_ops",),
+            ),
+            GinIndex(
+                fields=("description",),
+                name="advertisement_desc_trgm_idx",
+                opclasses=("gin_trgm_ops",),
+            ),
+            GinIndex(
+                fields=("search_vector",), name="advertisement_search_idx"
+            ),
+            GinIndex(
+                SearchVector("name", config="simple"),
+                name="active_name_words_idx",
+                condition=models.Q(status=AdvertisementStatus.ACTIVE.value),
+            ),
+        )
 
     def __str__(self):
         return self.name
@@ -73,7 +168,10 @@ class Advertisement(models.Model):
 class AdvertisementImages(models.Model):
     """Class to represent images."""
 
-    image = models.BinaryField(_("Image"))
+    key = models.CharField(_("Key"), max_length=64)
+    size = models.PositiveIntegerField(_("Size"))
+    width = models.PositiveIntegerField(_("Width"), null=True, blank=True)
+    height = models.PositiveIntegerField(_("Height"), null=True, blank=True)
     advertisement = models.ForeignKey(
         Advertisement, on_delete=models.CASCADE, related_name="images"
     )
@@ -81,9 +179,58 @@ class AdvertisementImages(models.Model):
     class Meta:
         verbose_name = "Изображение"
         verbose_name_plural = "Изображения"
+        indexes = [
+            models.Index(
+                fields=("advertisement", "id"),
+                name="image_advertisement_id_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.advertisement} - {self.key}"
+
+
+class AdvertisementImageVariant(models.Model):
+    """Class to represent resized copies of images."""
+
+    image = models.ForeignKey(
+        AdvertisementImages, on_delete=models.CASCADE, related_name="variants"
+    )
+    kind = models.CharField(
+        _("Kind"),
+        choices=[(kind.value, kind.name) for kind in ImageVariantKind],
+        max_length=30,
+    )
+    key = models.CharField(_("Key"), max_length=64)
+    size = models.PositiveIntegerField(_("Size"))
+    width = models.PositiveIntegerField(_("Width"))
+    height = models.PositiveIntegerField(_("Height"))
+
+    class Meta:
+        verbose_name = "Вариант изображения"
+        verbose_name_plural = "Варианты изображений"
+        constraints = (
+            models.UniqueConstraint(
+                fields=("image", "kind"), name="unique_image_variant_kind"
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.image} - {self.kind}"
+
+
+class ViewsBatch(models.Model):
+    """Class to represent a batch of buffered views written to the database."""
+
+    key = models.CharField(_("Key"), max_length=32, unique=True)
+    flushed_at = models.DateTimeField(_("Flushed At"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Пакет просмотров"
+        verbose_name_plural = "Пакеты просмотров"
 
     def __str__(self):
-        return f"{self.advertisement} - {self.image}"
+        return self.key
 
 
 class Region(models.Model):
@@ -111,6 +258,13 @@ class City(models.Model):
     class Meta:
         verbose_name = "Город"
         verbose_name_plural = "Города"
+        indexes = (
+            GinIndex(
+                fields=("name",),
+                name="city_name_trgm_idx",
+                opclasses=("gin_trgm_ops",),
+            ),
+        )
 
     def __str__(self):
         return self.name
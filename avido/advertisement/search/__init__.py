@@ -0,0 +1,45 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from advertisement.search.base import SUGGEST_SIZE, BaseSearchBackend
+
+SUGGEST_CACHE_KEY = "suggest:{}:{}"
+SUGGEST_CACHE_TIMEOUT = 60
+SUGGEST_MAX_LENGTH = 50
+
+
+@lru_cache(maxsize=None)
+def get_search_backend() -> BaseSearchBackend:
+    """Search backend configured by the `SEARCH_BACKEND` setting."""
+
+    return import_string(settings.SEARCH_BACKEND)()
+
+
+@receiver(setting_changed)
+def reset_search_backend(setting, **kwargs):
+    if setting == "SEARCH_BACKEND":
+        get_search_backend.cache_clear()
+
+
+def get_suggestions(prefix: str, size=SUGGEST_SIZE) -> list[dict]:
+    """
+    Type-ahead suggestions for a prefix.
+    Popular prefixes are asked for again and again,
+    so the answer is cached for a short while.
+    """
+
+    prefix = " ".join(prefix.lower().split())[:SUGGEST_MAX_LENGTH]
+
+    if not prefix:
+        return []
+
+    return cache.get_or_set(
+        SUGGEST_CACHE_KEY.format(size, prefix),
+        lambda: get_search_backend().suggest(prefix, size=size),
+        timeout=SUGGEST_CACHE_TIMEOUT,
+    )
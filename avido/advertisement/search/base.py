@@ -0,0 +1,72 @@
+from typing import NamedTuple
+
+SEARCH_SIZE = 100
+SUGGEST_SIZE = 5
+SUGGEST_MAX_SIZE = 10
+
+
+class CursorExpired(Exception):
+    """The search state behind a cursor is gone or not valid."""
+
+
+class SearchPage(NamedTuple):
+    """Found ids, the state of the next page and the facet counts."""
+
+    ids: list[int]
+    state: dict | None
+    facets: dict | None = None
+
+
+def get_offset(state) -> int:
+    """Offset of the page described by a `{"offset": n}` state."""
+
+    if state is None:
+        return 0
+
+    offset = state.get("offset") if isinstance(state, dict) else None
+
+    if not isinstance(offset, int) or offset < 0:
+        raise CursorExpired
+
+    return offset
+
+
+class BaseSearchBackend:
+    """
+    Full-text search over advertisement names and descriptions.
+    Backends return ids only, the caller loads the advertisements.
+    """
+
+    def search(
+        self,
+        name_query,
+        description_query,
+        size=SEARCH_SIZE,
+        state=None,
+        facets=(),
+        filters=None,
+    ) -> SearchPage:
+        """
+        One page of ids of the best matching advertisements,
+        most relevant first, and the state to fetch the next page with.
+        The requested facets are counted over all active matches
+        along with the first page.
+        `filters` are lookups on advertisement columns, as returned by
+        `AdvertisementFilter.get_lookups`, matches must satisfy them.
+        """
+
+        raise NotImplementedError
+
+    def suggest(self, prefix, size=SUGGEST_SIZE) -> list[dict]:
+        """
+        Ids and names of active advertisements completing the prefix,
+        most viewed first.
+        """
+
+        raise NotImplementedError
+
+    def update(self, advertisement_id: int) -> None:
+        """Called after an advertisement is saved and committed."""
+
+    def remove(self, advertisement_id: int) -> None:
+        """Called after an advertisement is deleted and committed."""
@@ -0,0 +1,41 @@
+from advertisement.search.base import (
+    SEARCH_SIZE,
+    SUGGEST_SIZE,
+    BaseSearchBackend,
+)
+from advertisement.tasks import delete_advertisement, index_advertisement
+from avido import elastic_config
+
+
+class ElasticsearchBackend(BaseSearchBackend):
+    """
+    Search in an Elasticsearch cluster.
+    The index is updated by Celery tasks.
+    """
+
+    def search(
+        self,
+        name_query,
+        description_query,
+        size=SEARCH_SIZE,
+        state=None,
+        facets=(),
+        filters=None,
+    ):
+        return elastic_config.search_description(
+            name_query,
+            description_query,
+            size=size,
+            state=state,
+            facets=facets,
+            filters=filters,
+        )
+
+    def suggest(self, prefix, size=SUGGEST_SIZE):
+        return elastic_config.suggest_names(prefix, size=size)
+
+    def update(self, advertisement_id):
+        index_advertisement.delay(advertisement_id)
+
+    def remove(self, advertisement_id):
+        delete_advertisement.delay(advertisement_id)
@@ -0,0 +1,306 @@
+import math
+import re
+import threading
+from collections import defaultdict
+
+from advertisement.db_utils import count_facets
+from advertisement.enums import AdvertisementStatus
+from advertisement.models import Advertisement
+from advertisement.search.base import (
+    SEARCH_SIZE,
+    SUGGEST_SIZE,
+    BaseSearchBackend,
+    SearchPage,
+    get_offset,
+)
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+MAX_GRAM = 20
+FIELDS = ("name", "description")
+LOADED_FIELDS = ("pk", *FIELDS, "status", "views")
+FUZZY_MATCH_WEIGHT = 0.5
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased runs of letters and digits, like the autocomplete tokenizer."""
+
+    return [token[:MAX_GRAM] for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+def get_edge_ngrams(text: str) -> set[str]:
+    """Every prefix of every token of the text."""
+
+    return {
+        token[:length]
+        for token in tokenize(text)
+        for length in range(1, len(token) + 1)
+    }
+
+
+def get_fuzziness(term: str) -> int:
+    """Allowed edit distance, as Elasticsearch `AUTO` fuzziness."""
+
+    if len(term) <= 2:
+        return 0
+
+    return 1 if len(term) <= 5 else 2
+
+
+def get_levenshtein_row(previous: list[int], term: str, char: str) -> list:
+    """
+    Edit distances between every prefix of the term and a gram,
+    from the row of the gram without its last character `char`.
+    """
+
+    current = [previous[0] + 1]
+
+    for column, term_char in enumerate(term, 1):
+        current.append(
+            min(
+                previous[column] + 1,
+                current[column - 1] + 1,
+                previous[column - 1] + (term_char != char),
+            )
+        )
+
+    return current
+
+
+def score_postings(postings, total: int) -> dict[int, float]:
+    """
+    Best score of each document among the matched grams of a term.
+    Rare grams score higher, as with the inverse document frequency.
+    """
+
+    scores = {}
+
+    for weight, advertisement_ids in postings:
+        score = weight * math.log(1 + total / len(advertisement_ids))
+
+        for advertisement_id in advertisement_ids:
+            scores[advertisement_id] = max(
+                scores.get(advertisement_id, 0), score
+            )
+
+    return scores
+
+
+class MemorySearchBackend(BaseSearchBackend):
+    """
+    Inverted index of edge n-grams kept in the process memory.
+    It is loaded from the database on the first search
+    and then updated one advertisement at a time,
+    so it suits tests and deployments running a single process.
+    The grams also form a trie, walked for the fuzzy matches.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._documents = {}
+        self._postings = {field: defaultdict(set) for field in FIELDS}
+        self._children = defaultdict(set)
+        self._suggestions = {}
+
+    def search(
+        self,
+        name_query,
+        description_query,
+        size=SEARCH_SIZE,
+        state=None,
+        facets=(),
+        filters=None,
+    ):
+        offset = get_offset(state)
+        scores = defaultdict(float)
+
+        with self._lock:
+            self._ensure_loaded()
+            matches = [
+                self._match(field, term)
+                for field, text in (
+                    ("name", name_query),
+                    ("description", description_query),
+                )
+                for term in tokenize(text)
+            ]
+            total = len(self._documents)
+
+        for postings in matches:
+            for advertisement_id, score in score_postings(
+                postings, total
+            ).items():
+                scores[advertisement_id] += score
+
+        ranked = sorted(scores, key=lambda pk: (-scores[pk], pk))
+
+        if filters:
+            allowed = set(
+                Advertisement.objects.filter(
+                    pk__in=ranked, **filters
+                ).values_list("pk", flat=True)
+            )
+            ranked = [pk for pk in ranked if pk in allowed]
+
+        ids = ranked[offset : offset + size + 1]
+        facet_counts = (
+            count_facets(
+                Advertisement.objects.filter(
+                    pk__in=ranked, status=AdvertisementStatus.ACTIVE.value
+                ),
+                facets,
+            )
+            if facets and state is None
+            else None
+        )
+
+        if len(ids) <= size:
+            return SearchPage(ids, None, facet_counts)
+
+        return SearchPage(ids[:size], {"offset": offset + size}, facet_counts)
+
+    def suggest(self, prefix, size=SUGGEST_SIZE):
+        terms = tokenize(prefix)
+
+        if not terms:
+            return []
+
+        with self._lock:
+            self._ensure_loaded()
+            ids = set.intersection(
+                *(self._postings["name"].get(term, set()) for term in terms)
+            )
+            found = sorted(
+                (
+                    self._suggestions[pk]
+                    for pk in ids
+                    if pk in self._suggestions
+                ),
+                key=lambda suggestion: (-suggestion[0], suggestion[1]),
+            )
+
+        return [{"id": pk, "name": name} for _, pk, name in found[:size]]
+
+    def update(self, advertisement_id):
+        with self._lock:
+            if not self._loaded:
+                return
+
+            self._discard(advertisement_id)
+            advertisement = (
+                Advertisement.objects.filter(pk=advertisement_id)
+                .values_list(*LOADED_FIELDS)
+                .first()
+            )
+
+            if advertisement is not None:
+                self._add(*advertisement)
+
+    def remove(self, advertisement_id):
+        with self._lock:
+            if self._loaded:
+                self._discard(advertisement_id)
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+
+        for advertisement in Advertisement.objects.values_list(
+            *LOADED_FIELDS
+        ).iterator():
+            self._add(*advertisement)
+
+        self._loaded = True
+
+    def _add(self, advertisement_id, name, description, status, views):
+        document = {}
+
+        for field, text in zip(FIELDS, (name, description)):
+            document[field] = get_edge_ngrams(text)
+
+            for gram in document[field]:
+                self._postings[field][gram].add(advertisement_id)
+                self._children[gram[:-1]].add(gram[-1])
+
+        self._documents[advertisement_id] = document
+
+        if status == AdvertisementStatus.ACTIVE.value:
+            self._suggestions[advertisement_id] = (
+                views,
+                advertisement_id,
+                name,
+            )
+
+    def _discard(self, advertisement_id):
+        document = self._documents.pop(advertisement_id, None)
+        self._suggestions.pop(advertisement_id, None)
+
+        if document is None:
+            return
+
+        for field, grams in document.items():
+            for gram in grams:
+                postings = self._postings[field][gram]
+                postings.discard(advertisement_id)
+
+                if not postings:
+                    del self._postings[field][gram]
+
+                    if not any(gram in self._postings[f] for f in FIELDS):
+                        self._drop_gram(gram)
+
+    def _drop_gram(self, gram):
+        """Remove a gram no document has anymore from the trie."""
+
+        parent = gram[:-1]
+        self._children[parent].discard(gram[-1])
+
+        if not self._children[parent]:
+            del self._children[parent]
+
+    def _get_fuzzy_grams(self, term, fuzziness) -> list[str]:
+        """
+        Grams within the edit distance of the term, other than the term.
+        The trie is walked with one Levenshtein row per gram,
+        branches whose every distance exceeds `fuzziness` are cut.
+        """
+
+        found = []
+        stack = [("", list(range(len(term) + 1)))]
+
+        while stack:
+            gram, row = stack.pop()
+
+            for char in self._children.get(gram, ()):
+                child = gram + char
+                child_row = get_levenshtein_row(row, term, char)
+
+                if child_row[-1] <= fuzziness and child != term:
+                    found.append(child)
+
+                if min(child_row) <= fuzziness:
+                    stack.append((child, child_row))
+
+        return found
+
+    def _match(self, field, term) -> list[tuple[float, tuple]]:
+        """
+        Weights and copied postings of the grams matching the term:
+        the term itself and, weighted lower, the grams within
+        the fuzzy edit distance. The copies are scored without the lock.
+        """
+
+        fuzziness = get_fuzziness(term)
+        candidates = [(term, 1.0)]
+
+        if fuzziness:
+            candidates += [
+                (gram, FUZZY_MATCH_WEIGHT)
+                for gram in self._get_fuzzy_grams(term, fuzziness)
+            ]
+
+        return [
+            (weight, tuple(self._postings[field][gram]))
+            for gram, weight in candidates
+            if self._postings[field].get(gram)
+        ]
@@ -0,0 +1,125 @@
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db.models import F, Q
+
+from advertisement.db_utils import count_facets
+from advertisement.enums import AdvertisementStatus
+from advertisement.models import Advertisement
+from advertisement.search.base import (
+    SEARCH_SIZE,
+    SUGGEST_SIZE,
+    BaseSearchBackend,
+    SearchPage,
+    get_offset,
+)
+
+SEARCH_CONFIG = "russian"
+SUGGEST_CONFIG = "simple"
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+def get_name_words() -> SearchVector:
+    """Unstemmed words of the name, as indexed for the suggestions."""
+
+    return SearchVector("name", config=SUGGEST_CONFIG)
+
+
+def get_suggest_query(prefix: str) -> SearchQuery | None:
+    """
+    Words of the prefix following each other in the name,
+    the last one possibly not typed to the end.
+    """
+
+    words = WORD_PATTERN.findall(prefix.lower())
+
+    if not words:
+        return None
+
+    return SearchQuery(
+        " <-> ".join(words) + ":*", config=SUGGEST_CONFIG, search_type="raw"
+    )
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Search on the stored `search_vector` column, ranked by `ts_rank`.
+    Substring matches served by the trigram indexes are kept as well,
+    so partly typed words are found like with the autocomplete analyzer.
+    The column is generated by the database, there is nothing to update.
+    """
+
+    def search(
+        self,
+        name_query,
+        description_query,
+        size=SEARCH_SIZE,
+        state=None,
+        facets=(),
+        filters=None,
+    ):
+        offset = get_offset(state)
+
+        query = None
+        matches = Q()
+
+        for field, text in (
+            ("name", name_query),
+            ("description", description_query),
+        ):
+            if not text:
+                continue
+
+            text_query = SearchQuery(
+                text, config=SEARCH_CONFIG, search_type="websearch"
+            )
+            query = text_query if query is None else query | text_query
+            matches |= Q(**{f"{field}__icontains": text})
+
+        if query is None:
+            return SearchPage([], None)
+
+        found = Advertisement.objects.filter(
+            Q(search_vector=query) | matches, **(filters or {})
+        )
+        ids = list(
+            found.annotate(rank=SearchRank(F("search_vector"), query))
+            .order_by("-rank", "pk")
+            .values_list("pk", flat=True)[offset : offset + size + 1]
+        )
+        facet_counts = (
+            count_facets(
+                found.filter(status=AdvertisementStatus.ACTIVE.value), facets
+            )
+            if facets and state is None
+            else None
+        )
+
+        if len(ids) <= size:
+            return SearchPage(ids, None, facet_counts)
+
+        return SearchPage(ids[:size], {"offset": offset + size}, facet_counts)
+
+    def suggest(self, prefix, size=SUGGEST_SIZE):
+        """
+        Names with a word starting with the prefix, like the completion
+        suggester fed with every word suffix of the name.
+        The prefix query is served by the partial words index
+        whatever the prefix length.
+        """
+
+        query = get_suggest_query(prefix)
+
+        if query is None:
+            return []
+
+        return list(
+            Advertisement.objects.alias(name_words=get_name_words())
+            .filter(status=AdvertisementStatus.ACTIVE.value, name_words=query)
+            .order_by("-views", "pk")
+            .values("id", "name")[:size]
+        )
@@ -0,0 +1,123 @@
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from advertisement.db_utils import invalidate_category_tree
+from advertisement.enums import AdvertisementStatus, ImageVariantKind
+from advertisement.models import (
+    Advertisement,
+    AdvertisementCategory,
+    AdvertisementImages,
+    AdvertisementImageVariant,
+    City,
+)
+from advertisement.search import get_search_backend
+from advertisement.tasks import generate_image_variants
+from api.services.list_cache import list_cache
+
+
+@receiver(post_save, sender=Advertisement)
+def advertisement_saved(sender, instance, **kwargs):
+    """Reindex the advertisement once the transaction is committed."""
+
+    transaction.on_commit(lambda: get_search_backend().update(instance.pk))
+
+
+@receiver(post_delete, sender=Advertisement)
+def advertisement_deleted(sender, instance, **kwargs):
+    """Drop the advertisement from the index once it is deleted."""
+
+    advertisement_id = instance.pk
+    transaction.on_commit(lambda: get_search_backend().remove(advertisement_id))
+
+
+@receiver(post_save, sender=AdvertisementImages)
+def advertisement_image_saved(sender, instance, created, **kwargs):
+    """Resize new images in the background once they are committed."""
+
+    if created:
+        transaction.on_commit(
+            lambda: generate_image_variants.delay(instance.pk)
+        )
+
+
+@receiver(post_save, sender=AdvertisementCategory)
+@receiver(post_delete, sender=AdvertisementCategory)
+def category_changed(sender, instance, **kwargs):
+    """
+    Drop the cached category tree now and once more after commit,
+    so a tree cached from not yet committed data does not survive.
+    """
+
+    invalidate_category_tree()
+    transaction.on_commit(invalidate_category_tree)
+
+
+def is_listed(**lookups) -> bool:
+    """Whether a matching advertisement is shown in public lists."""
+
+    return Advertisement.objects.filter(
+        status=AdvertisementStatus.ACTIVE.value, **lookups
+    ).exists()
+
+
+def bump_list_cache():
+    """Cached list pages become stale once the transaction is committed."""
+
+    transaction.on_commit(list_cache.bump)
+
+
+@receiver(pre_save, sender=Advertisement)
+@receiver(pre_delete, sender=Advertisement)
+def advertisement_listing_changing(sender, instance, **kwargs):
+    """
+    Remember whether the advertisement is listed before the change,
+    edits of drafts and other unlisted ads keep the cache.
+    """
+
+    instance._was_listed = instance.pk is not None and is_listed(pk=instance.pk)
+
+
+@receiver(post_save, sender=Advertisement)
+@receiver(post_delete, sender=Advertisement)
+def advertisement_listing_changed(sender, instance, **kwargs):
+    """An ad was, or is now, shown in public lists."""
+
+    is_active = instance.status == AdvertisementStatus.ACTIVE.value
+
+    if getattr(instance, "_was_listed", True) or is_active:
+        bump_list_cache()
+
+
+@receiver(post_save, sender=AdvertisementImages)
+@receiver(post_delete, sender=AdvertisementImages)
+def image_listing_changed(sender, instance, **kwargs):
+    """Images of listed ads are shown as their cards."""
+
+    if is_listed(pk=instance.advertisement_id):
+        bump_list_cache()
+
+
+@receiver(post_save, sender=AdvertisementImageVariant)
+def variant_listing_changed(sender, instance, **kwargs):
+    """Only card variants of listed ads are shown in lists."""
+
+    if instance.kind == ImageVariantKind.CARD.value and is_listed(
+        images=instance.image_id
+    ):
+        bump_list_cache()
+
+
+@receiver(post_save, sender=AdvertisementCategory)
+@receiver(post_delete, sender=AdvertisementCategory)
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+def list_changed(sender, instance, **kwargs):
+    """Category and city names are shown in lists and used by filters."""
+
+    bump_list_cache()
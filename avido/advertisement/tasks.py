@@ -0,0 +1,76 @@
+from celery import shared_task
+from django.utils import timezone
+
+from advertisement.enums import ImageVariantKind
+from advertisement.models import (
+    Advertisement,
+    AdvertisementImages,
+    AdvertisementImageVariant,
+)
+from api.services.blob_storage import get_blob_storage
+from api.services.thumbnails import make_variant
+from api.services.views_counter import views_counter
+from avido import elastic_config
+
+
+@shared_task(
+    name="index_advertisement", acks_late=True, autoretry_for=(Exception,)
+)
+def index_advertisement(advertisement_id: int) -> None:
+    """Celery task for writing an advertisement to the search index."""
+
+    advertisement = Advertisement.objects.filter(pk=advertisement_id).first()
+
+    if advertisement is None:
+        elastic_config.delete_advertisement(advertisement_id)
+        return
+
+    elastic_config.index_advertisement(advertisement)
+
+
+@shared_task(
+    name="delete_advertisement", acks_late=True, autoretry_for=(Exception,)
+)
+def delete_advertisement(advertisement_id: int) -> None:
+    """Celery task for removing an advertisement from the search index."""
+
+    elastic_config.delete_advertisement(advertisement_id)
+
+
+@shared_task(
+    name="generate_image_variants", acks_late=True, autoretry_for=(Exception,)
+)
+def generate_image_variants(image_id: int) -> None:
+    """Celery task for producing the resized copies of an uploaded image."""
+
+    image = AdvertisementImages.objects.filter(pk=image_id).first()
+
+    if image is None:
+        return
+
+    storage = get_blob_storage()
+    content = storage.read(image.key)
+
+    for kind in ImageVariantKind:
+        key, size, width, height = storage.save(make_variant(content, kind))
+        AdvertisementImageVariant.objects.update_or_create(
+            image=image,
+            kind=kind.value,
+            defaults={
+                "key": key,
+                "size": size,
+                "width": width,
+                "height": height,
+            },
+        )
+
+    Advertisement.objects.filter(pk=image.advertisement_id).update(
+        updated_at=timezone.now()
+    )
+
+
+@shared_task(name="flush_advertisement_views")
+def flush_advertisement_views() -> int:
+    """Celery task for writing buffered views to the database."""
+
+    return views_counter.flush()
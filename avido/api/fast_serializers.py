@@ -0,0 +1,136 @@
+from decimal import Decimal
+from operator import itemgetter
+
+from django.db.models import OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from advertisement.enums import ImageVariantKind
+from advertisement.models import (
+    Advertisement,
+    AdvertisementImages,
+    AdvertisementImageVariant,
+)
+from api.serializers import ListAdvertisementsSerializer, get_requested_fields
+
+IMAGE_KEY_PLACEHOLDER = "0" * 64
+PRICE_QUANTUM = Decimal(1).scaleb(
+    -Advertisement._meta.get_field("price").decimal_places
+)
+
+
+def annotate_card_image_key(queryset: QuerySet) -> QuerySet:
+    """
+    Key of the card shown in lists: the card variant of the first image,
+    or the first image itself while the variant is not generated yet.
+    """
+
+    first_image = AdvertisementImages.objects.filter(
+        advertisement=OuterRef("pk")
+    ).order_by("pk")
+    card_variant = AdvertisementImageVariant.objects.filter(
+        image=Subquery(
+            AdvertisementImages.objects.filter(
+                advertisement=OuterRef(OuterRef("pk"))
+            )
+            .order_by("pk")
+            .values("pk")[:1]
+        ),
+        kind=ImageVariantKind.CARD.value,
+    )
+
+    return queryset.annotate(
+        card_image_key=Coalesce(
+            Subquery(card_variant.values("key")[:1]),
+            Subquery(first_image.values("key")[:1]),
+        )
+    )
+
+
+def format_price(value: Decimal) -> str:
+    """`DecimalField` output, prices are sent as strings."""
+
+    return f"{value.quantize(PRICE_QUANTUM):f}"
+
+
+def format_datetime(value, tz) -> str | None:
+    """`DateTimeField` output, ISO 8601 with `Z` for UTC."""
+
+    if not value:
+        return None
+
+    value = value.astimezone(tz).isoformat()
+
+    return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+
+class FastListAdvertisementsSerializer:
+    """
+    Read-only twin of `ListAdvertisementsSerializer` for the hot list.
+    Rows come from `values_list()` in one query, every field is compiled
+    once into an accessor of the row tuple, and the output is the same
+    JSON the model serializer produces.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.columns = ["pk", "created_at", "price"]
+        fields = dict.fromkeys(ListAdvertisementsSerializer.Meta.fields)
+        requested = get_requested_fields(request, fields)
+        self.accessors = [
+            (name, self.compile(name)) for name in fields if name in requested
+        ]
+
+    def column(self, name: str) -> int:
+        """Position of a selected column, selecting it if needed."""
+
+        if name not in self.columns:
+            self.columns.append(name)
+
+        return self.columns.index(name)
+
+    def compile(self, name: str):
+        """Accessor building the value of a serializer field from a row."""
+
+        if name in ("category", "city"):
+            index = self.column(f"{name}__name")
+            return lambda row: {"name": row[index]}
+
+        if name == "price":
+            index = self.column(name)
+            return lambda row: format_price(row[index])
+
+        if name in ("created_at", "updated_at"):
+            index = self.column(name)
+            tz = timezone.get_current_timezone()
+            return lambda row: format_datetime(row[index], tz)
+
+        if name == "image":
+            index = self.column("card_image_key")
+            prefix, suffix = reverse(
+                "api:image",
+                kwargs={"key": IMAGE_KEY_PLACEHOLDER},
+                request=self.request,
+            ).split(IMAGE_KEY_PLACEHOLDER)
+            return lambda row: (
+                None if row[index] is None else f"{prefix}{row[index]}{suffix}"
+            )
+
+        return itemgetter(self.column(name))
+
+    def get_rows(self, queryset: QuerySet) -> QuerySet:
+        """Named row tuples with the selected columns only."""
+
+        if "card_image_key" in self.columns:
+            queryset = annotate_card_image_key(queryset)
+
+        return queryset.values_list(*self.columns, named=True)
+
+    def to_representation(self, rows) -> list[dict]:
+        accessors = self.accessors
+
+        return [
+            {name: accessor(row) for name, accessor in accessors}
+            for row in rows
+        ]
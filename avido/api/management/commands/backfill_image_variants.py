@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from advertisement.enums import ImageVariantKind
+from advertisement.models import AdvertisementImages
+from advertisement.tasks import generate_image_variants
+
+
+class Command(BaseCommand):
+    """Command to enqueue resized copies of images uploaded without them."""
+
+    help = (
+        "Enqueue generate_image_variants for every image missing "
+        "some of its variants, in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Image ids read and enqueued per batch.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Main function of the backfill.
+        Images are walked by id, so every batch is an index range
+        and images uploaded meanwhile are handled by the upload signal.
+        """
+
+        images = (
+            AdvertisementImages.objects.annotate(
+                variants_count=Count("variants")
+            )
+            .filter(variants_count__lt=len(ImageVariantKind))
+            .order_by("pk")
+        )
+        last_id = 0
+        enqueued = 0
+
+        while True:
+            batch = list(
+                images.filter(pk__gt=last_id).values_list("pk", flat=True)[
+                    : options["batch_size"]
+                ]
+            )
+
+            if not batch:
+                break
+
+            for image_id in batch:
+                generate_image_variants.delay(image_id)
+
+            last_id = batch[-1]
+            enqueued += len(batch)
+            self.stdout.write(f"Enqueued {enqueued} images")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Image variants enqueued for {enqueued} images")
+        )
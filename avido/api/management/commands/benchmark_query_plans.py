@@ -0,0 +1,244 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import QuerySet
+
+from advertisement.enums import AdvertisementStatus
+from advertisement.models import (
+    Advertisement,
+    AdvertisementCategory,
+    City,
+)
+from api.pagination import KeysetPagination
+from users.models import User
+
+PAGE_SIZE = 21
+PLAN_INDEXES = (
+    "active_created_id_idx",
+    "active_price_id_idx",
+    "active_city_created_idx",
+    "active_category_created_idx",
+)
+RESET_SEQUENCE_SQL = """
+    SELECT setval(
+        pg_get_serial_sequence('advertisement_advertisement', 'id'),
+        COALESCE(MAX(id), 1)
+    )
+    FROM advertisement_advertisement
+"""
+NO_INDEX_SCAN_SQL = """
+    SET LOCAL enable_indexscan = off;
+    SET LOCAL enable_indexonlyscan = off;
+    SET LOCAL enable_bitmapscan = off
+"""
+GENERATE_SQL = """
+    INSERT INTO advertisement_advertisement (
+        name, description, price, views, status,
+        created_at, updated_at, category_id, city_id, user_id
+    )
+    SELECT
+        'benchmark ' || md5(random()::text || g),
+        'benchmark advertisement',
+        round((random() * 100000)::numeric, 1),
+        0,
+        (%(statuses)s::varchar[])[1 + g %% %(statuses_count)s],
+        now() - g * interval '1 second',
+        now(),
+        (%(categories)s::bigint[])[1 + g %% %(categories_count)s],
+        (%(cities)s::bigint[])[1 + g %% %(cities_count)s],
+        %(user)s
+    FROM generate_series(1, %(rows)s) AS g
+"""
+
+
+class Command(BaseCommand):
+    """Command to show query plans of the hot advertisement filters."""
+
+    help = (
+        "Optionally fill the table with synthetic rows, then EXPLAIN ANALYZE "
+        "the public list queries with and without the index plan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=0,
+            help="Top the advertisements table up to this many rows.",
+        )
+        parser.add_argument(
+            "--drop-indexes",
+            action="store_true",
+            help=(
+                "Take the baseline with the plan indexes dropped "
+                "in a rolled back transaction. DROP INDEX locks the table "
+                "against all reads and writes until the EXPLAIN ANALYZE "
+                "is over, never use it on a live database."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        """
+        Main function of the benchmark.
+        The baseline plan is taken with index, index only and bitmap scans
+        disabled for its transaction only, so it reads the whole table
+        and sorts the matching rows.
+        With `--drop-indexes` the indexes of the plan are dropped instead,
+        inside a transaction that is rolled back,
+        and the baseline only has the primary and foreign keys.
+        """
+
+        self.generate(options["rows"])
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE advertisement_advertisement")
+
+        baseline = (
+            "PK and FK indexes only"
+            if options["drop_indexes"]
+            else "without index scans"
+        )
+
+        for title, queryset in self.get_queries():
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            scans = self.explain(
+                baseline,
+                queryset,
+                sql=(
+                    [f"DROP INDEX IF EXISTS {index}" for index in PLAN_INDEXES]
+                    if options["drop_indexes"]
+                    else [NO_INDEX_SCAN_SQL]
+                ),
+            )
+
+            if not options["drop_indexes"] and any(
+                "Index" in scan for scan in scans
+            ):
+                raise CommandError(
+                    f"The baseline plan of {title!r} still uses an index."
+                )
+
+            self.explain("with index plan", queryset)
+
+    def generate(self, rows: int) -> None:
+        """Insert synthetic advertisements with a single statement."""
+
+        missing = rows - Advertisement.objects.count()
+
+        if missing <= 0:
+            return
+
+        user = User.objects.first()
+        cities = list(City.objects.values_list("pk", flat=True))
+        categories = list(
+            AdvertisementCategory.objects.values_list("pk", flat=True)
+        )
+
+        if not (user and cities and categories):
+            raise CommandError(
+                "Users, cities and categories are required, "
+                "run load_test_data first."
+            )
+
+        self.stdout.write(self.style.WARNING(f"Generating {missing} rows..."))
+        statuses = [status.value for status in AdvertisementStatus]
+
+        with connection.cursor() as cursor:
+            cursor.execute(RESET_SEQUENCE_SQL)
+            cursor.execute(
+                GENERATE_SQL,
+                {
+                    "statuses": statuses,
+                    "statuses_count": len(statuses),
+                    "categories": categories,
+                    "categories_count": len(categories),
+                    "cities": cities,
+                    "cities_count": len(cities),
+                    "user": user.pk,
+                    "rows": missing,
+                },
+            )
+
+    @staticmethod
+    def get_queries() -> list[tuple[str, QuerySet]]:
+        """Pages of the public list, as the API builds them."""
+
+        active = Advertisement.objects.filter(
+            status=AdvertisementStatus.ACTIVE.value
+        )
+        city = City.objects.first()
+        category = AdvertisementCategory.objects.first()
+        latest = ("-created_at", "-id")
+        middle = active.order_by(*latest)[active.count() // 2 :].first()
+        queries = [
+            ("Latest", active.order_by(*latest)[:PAGE_SIZE]),
+            ("Cheapest", active.order_by("price", "id")[:PAGE_SIZE]),
+            (
+                "Price range",
+                active.filter(price__range=(1000, 1100)).order_by(
+                    "price", "id"
+                )[:PAGE_SIZE],
+            ),
+            (
+                "City",
+                active.filter(city=city).order_by(*latest)[:PAGE_SIZE],
+            ),
+            (
+                "Category",
+                active.filter(category=category).order_by(*latest)[:PAGE_SIZE],
+            ),
+        ]
+
+        if middle is not None:
+            after = KeysetPagination.get_after_filter(
+                active,
+                {
+                    "ordering": "-created_at",
+                    "key": [str(middle.created_at), middle.pk],
+                },
+                "-created_at",
+            )
+            queries.append(
+                (
+                    "Latest, page in the middle",
+                    active.filter(after).order_by(*latest)[:PAGE_SIZE],
+                )
+            )
+
+        return queries
+
+    def explain(self, title: str, queryset: QuerySet, sql=()) -> list[str]:
+        """
+        Print the plan of the query, after `sql` run in its transaction.
+        Returns the scan nodes of the plan.
+        """
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for statement in sql:
+                    cursor.execute(statement)
+
+            started = time.monotonic()
+            plan = queryset.explain(analyze=True)
+            elapsed = (time.monotonic() - started) * 1000
+
+            transaction.set_rollback(True)
+
+        scans = [
+            line.strip().split("  (")[0]
+            for line in plan.splitlines()
+            if "Scan" in line
+        ]
+        style = (
+            self.style.ERROR
+            if any("Seq Scan" in scan for scan in scans)
+            else self.style.SUCCESS
+        )
+
+        self.stdout.write(f"  {title}: {elapsed:.1f} ms")
+
+        for scan in scans:
+            self.stdout.write(style(f"    {scan.lstrip('-> ')}"))
+
+        return scans
@@ -0,0 +1,162 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from advertisement.db_utils import prefetch_for_list
+from advertisement.enums import AdvertisementStatus
+from advertisement.models import (
+    Advertisement,
+    AdvertisementCategory,
+    AdvertisementImages,
+    City,
+    Region,
+)
+from api.fast_serializers import FastListAdvertisementsSerializer
+from api.serializers import ListAdvertisementsSerializer
+from users.models import User
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """Command to compare the model and the fast list serializers."""
+
+    help = (
+        "Serialize and render synthetic advertisements with the model "
+        "serializer and with the values-based fast path."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            default="1000,10000",
+            help="Comma separated row counts to benchmark.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Runs per serializer, the best one is reported.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Main function of the benchmark.
+        The rows are created inside a transaction that is rolled back,
+        so the database is left untouched.
+        """
+
+        try:
+            counts = [int(rows) for rows in options["rows"].split(",")]
+        except ValueError:
+            raise CommandError("--rows must be comma separated integers.")
+
+        request = Request(
+            APIRequestFactory().get(
+                "/api/ads/advertisements/", SERVER_NAME="localhost"
+            )
+        )
+
+        with transaction.atomic():
+            queryset = self.generate(max(counts))
+
+            for rows in counts:
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{rows} rows"))
+                self.compare(request, queryset[:rows], options["repeat"])
+
+            transaction.set_rollback(True)
+
+    def generate(self, rows: int):
+        """Insert synthetic active advertisements, every other with an image."""
+
+        user = User.objects.create(
+            username="benchmark",
+            email="benchmark@example.com",
+            phone_number="benchmark",
+        )
+        region = Region.objects.create(name="Benchmark region")
+        city = City.objects.create(name="Benchmark city", region=region)
+        category = AdvertisementCategory.objects.create(
+            name="Benchmark category",
+            slug="benchmark-category",
+            description="benchmark",
+            sort_order=0,
+        )
+        ads = Advertisement.objects.bulk_create(
+            (
+                Advertisement(
+                    name=f"benchmark {number}",
+                    description="benchmark advertisement",
+                    price=number,
+                    status=AdvertisementStatus.ACTIVE.value,
+                    category=category,
+                    city=city,
+                    user=user,
+                )
+                for number in range(rows)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        AdvertisementImages.objects.bulk_create(
+            (
+                AdvertisementImages(
+                    key=f"{ad.pk:064x}",
+                    size=0,
+                    width=0,
+                    height=0,
+                    advertisement=ad,
+                )
+                for ad in ads[::2]
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE advertisement_advertisement")
+            cursor.execute("ANALYZE advertisement_advertisementimages")
+
+        return Advertisement.objects.filter(user=user).order_by("pk")
+
+    def compare(self, request: Request, queryset, repeat: int) -> None:
+        """Print the best time of each serializer and check the output."""
+
+        def model():
+            return JSONRenderer().render(
+                ListAdvertisementsSerializer(
+                    prefetch_for_list(queryset),
+                    many=True,
+                    context={"request": request},
+                ).data
+            )
+
+        def fast():
+            serializer = FastListAdvertisementsSerializer(request)
+            return JSONRenderer().render(
+                serializer.to_representation(serializer.get_rows(queryset))
+            )
+
+        timings = {}
+
+        for title, serialize in (("model serializer", model), ("fast", fast)):
+            best = float("inf")
+
+            for _ in range(repeat):
+                started = time.monotonic()
+                rendered = serialize()
+                best = min(best, (time.monotonic() - started) * 1000)
+
+            timings[title] = (best, rendered)
+            self.stdout.write(f"  {title}: {best:.1f} ms")
+
+        (model_ms, expected), (fast_ms, rendered) = timings.values()
+
+        if rendered != expected:
+            self.stdout.write(self.style.ERROR("  output differs"))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"  same output, x{model_ms / fast_ms:.1f}")
+            )
@@ -0,0 +1,117 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from advertisement.models import Advertisement
+from avido import elastic_config
+
+REPORT_EVERY = 10000
+HTTP_CONFLICT = 409
+
+
+class Command(BaseCommand):
+    """Command to rebuild the advertisements search index."""
+
+    help = (
+        "Stream all advertisements into a new versioned index "
+        "and atomically switch the search alias to it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Documents per bulk request and per DB fetch.",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=4,
+            help="Number of bulk requests in flight.",
+        )
+        parser.add_argument(
+            "--keep-old",
+            action="store_true",
+            help="Do not delete the previous indices after the swap.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Main function to rebuild the index.
+        Rows are read with a server-side cursor and sent in bulk batches
+        into a fresh index, which replaces the old one only when complete.
+        """
+
+        index_name = elastic_config.create_rebuild_index()
+        self.stdout.write(self.style.WARNING(f"Building {index_name}..."))
+
+        try:
+            failed = self.fill_index(index_name, options)
+        except Exception:
+            elastic_config.delete_index(index_name)
+            raise
+
+        if failed:
+            elastic_config.delete_index(index_name)
+            self.stdout.write(
+                self.style.ERROR(
+                    f"{failed} documents failed, alias left unchanged"
+                )
+            )
+            return
+
+        elastic_config.finish_bulk_load(index_name)
+        old_indices = elastic_config.swap_alias(index_name)
+
+        if not options["keep_old"]:
+            for old_index in old_indices:
+                elastic_config.delete_index(old_index)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Search index successfully rebuilt: {index_name}"
+            )
+        )
+
+    def fill_index(self, index_name: str, options: dict) -> int:
+        """Bulk load every advertisement, returns the number of failures."""
+
+        batch_size = options["batch_size"]
+        advertisements = (
+            Advertisement.objects.only(*elastic_config.DOCUMENT_FIELDS)
+            .order_by("pk")
+            .iterator(chunk_size=batch_size)
+        )
+
+        indexed = failed = 0
+        started = time.monotonic()
+
+        for ok, info in elastic_config.bulk_index_advertisements(
+            advertisements,
+            index_name,
+            chunk_size=batch_size,
+            thread_count=options["threads"],
+            queue_size=options["threads"],
+        ):
+            if ok or info["create"].get("status") == HTTP_CONFLICT:
+                indexed += 1
+            else:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"Failed to index: {info}"))
+
+            if (indexed + failed) % REPORT_EVERY == 0:
+                self.report(indexed, failed, started)
+
+        self.report(indexed, failed, started)
+
+        return failed
+
+    def report(self, indexed: int, failed: int, started: float) -> None:
+        """Print progress and throughput."""
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f"Indexed {indexed}, failed {failed}, "
+            f"{(indexed + failed) / elapsed:.0f} docs/s"
+        )
@@ -0,0 +1,143 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+CURSOR_QUERY_PARAM = "cursor"
+INVALID_CURSOR_MESSAGE = "Invalid cursor"
+
+
+def encode_cursor(state: dict) -> str:
+    """Packs a pagination state into an opaque cursor string."""
+
+    return urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+def decode_cursor(request: Request) -> dict | None:
+    """Unpacks the cursor from the request query params."""
+
+    cursor = request.query_params.get(CURSOR_QUERY_PARAM)
+
+    if not cursor:
+        return None
+
+    try:
+        state = json.loads(urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError):
+        raise NotFound(INVALID_CURSOR_MESSAGE)
+
+    if not isinstance(state, dict):
+        raise NotFound(INVALID_CURSOR_MESSAGE)
+
+    return state
+
+
+def get_next_link(request: Request, state: dict | None) -> str | None:
+    """Url of the next page, `None` on the last page."""
+
+    if state is None:
+        return None
+
+    return replace_query_param(
+        request.build_absolute_uri(), CURSOR_QUERY_PARAM, encode_cursor(state)
+    )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over `(field, id)` keys.
+    Every page is an indexed range scan starting after the last row
+    of the previous page, so its cost does not depend on the depth
+    and no `COUNT(*)` is issued.
+    """
+
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    ordering_query_param = "ordering"
+    orderings = ("-created_at", "created_at", "-price", "price")
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_ordering(self, request: Request) -> str:
+        ordering = request.query_params.get(self.ordering_query_param)
+
+        return ordering if ordering in self.orderings else self.orderings[0]
+
+    def paginate_queryset(self, queryset, request, view=None) -> list:
+        self.request = request
+        ordering = self.get_ordering(request)
+        field_name = ordering.lstrip("-")
+        descending = ordering.startswith("-")
+        page_size = self.get_page_size(request)
+        state = decode_cursor(request)
+
+        if state is not None:
+            queryset = queryset.filter(
+                self.get_after_filter(queryset, state, ordering)
+            )
+
+        page = list(
+            queryset.order_by(
+                *(
+                    f"-{name}" if descending else name
+                    for name in (field_name, "pk")
+                )
+            )[: page_size + 1]
+        )
+
+        self.next_state = None
+
+        if len(page) > page_size:
+            page = page[:page_size]
+            last = page[-1]
+            self.next_state = {
+                "ordering": ordering,
+                "key": [str(getattr(last, field_name)), last.pk],
+            }
+
+        return page
+
+    @staticmethod
+    def get_after_filter(queryset, state: dict, ordering: str) -> Q:
+        """Condition selecting rows strictly after the cursor key."""
+
+        field_name = ordering.lstrip("-")
+        lookup = "lt" if ordering.startswith("-") else "gt"
+
+        try:
+            value, pk = state["key"]
+            value = queryset.model._meta.get_field(field_name).to_python(value)
+            pk = int(pk)
+        except (KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(INVALID_CURSOR_MESSAGE)
+
+        if state.get("ordering") != ordering or value is None:
+            raise NotFound(INVALID_CURSOR_MESSAGE)
+
+        # The bound alone is an index range condition on `(field, id)`,
+        # the rest only filters the rows sharing the cursor value.
+        return Q(**{f"{field_name}__{lookup}e": value}) & (
+            Q(**{f"{field_name}__{lookup}": value})
+            | Q(**{field_name: value, f"pk__{lookup}": pk})
+        )
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(
+            {
+                "next": get_next_link(self.request, self.next_state),
+                "results": data,
+            }
+        )
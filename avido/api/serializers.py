@@ -1,11 +1,11 @@
-import base64
-
 from django.forms import ModelChoiceField
 from django.utils.text import slugify
 from rest_framework import serializers
 from rest_framework.fields import CurrentUserDefault
+from rest_framework.reverse import reverse
 from transliterate import translit
 
+from advertisement.enums import ImageVariantKind
 from advertisement.models import (
     Advertisement,
     AdvertisementCategory,
@@ -14,7 +14,9 @@ from advertisement.models import (
     ModerationRecordHistory,
     Region,
 )
+from api.services.blob_storage import get_blob_storage
 from api.services.check_image_size import check_image_size
+from api.services.views_counter import views_counter
 from users.db_utils import create_user
 from users.models import User
 
@@ -56,12 +58,71 @@ class SetPasswordSerializer(serializers.Serializer):
     repeat_password = serializers.CharField(min_length=8)
 
 
-class ImagesSerializer(serializers.ModelSerializer):
-    """Serializer listing advertisement's images."""
+def get_image_url(
+    image: AdvertisementImages | None,
+    request,
+    kind: ImageVariantKind | None = None,
+) -> str | None:
+    """
+    Absolute url of the image endpoint for a stored image.
+    With `kind` it points to that resized variant,
+    or to the original while the variant is not generated yet.
+    """
 
-    class Meta:
-        model = AdvertisementImages
-        fields = ("image", "advertisement")
+    if image is None:
+        return None
+
+    key = image.key
+
+    if kind is not None:
+        variants = getattr(image, f"{kind.value}_variants", None)
+
+        if variants is None:
+            variants = [
+                variant
+                for variant in image.variants.all()
+                if variant.kind == kind.value
+            ]
+
+        if variants:
+            key = variants[0].key
+
+    return reverse("api:image", kwargs={"key": key}, request=request)
+
+
+def get_requested_fields(request, fields) -> tuple:
+    """
+    Serializer fields picked with the `fields` and `omit` query params,
+    e.g. `?fields=name,price` or `?omit=description`.
+    Unknown names are ignored.
+    """
+
+    if request is None:
+        return tuple(fields)
+
+    picked = [
+        name
+        for name in request.query_params.get("fields", "").split(",")
+        if name in fields
+    ]
+    omitted = request.query_params.get("omit", "").split(",")
+
+    return tuple(
+        name for name in dict.fromkeys(picked or fields) if name not in omitted
+    )
+
+
+class SparseFieldsMixin:
+    """Drops the fields not picked by the request, see `get_requested_fields`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = get_requested_fields(
+            self.context.get("request"), self.Meta.fields
+        )
+
+        for name in set(self.fields) - set(requested):
+            self.fields.pop(name)
 
 
 class CreateRegionSerializer(serializers.ModelSerializer):
@@ -98,7 +159,9 @@ class ListCategorySerializer(serializers.ModelSerializer):
         fields = ("name",)
 
 
-class ListAdvertisementsSerializer(serializers.ModelSerializer):
+class ListAdvertisementsSerializer(
+    SparseFieldsMixin, serializers.ModelSerializer
+):
     """Serializer listing all advertisements."""
 
     category = ListCategorySerializer(read_only=True)
@@ -122,17 +185,26 @@ class ListAdvertisementsSerializer(serializers.ModelSerializer):
     def get_image(self, obj):
         """Method for custom serializer field."""
 
-        images = obj.images.first()
-        return ImagesSerializer(images, many=False).data
+        if hasattr(obj, "first_images"):
+            images = obj.first_images[0] if obj.first_images else None
+        else:
+            images = obj.images.first()
+
+        return get_image_url(
+            images, self.context.get("request"), ImageVariantKind.CARD
+        )
 
 
-class DetailAdvertisementsSerializer(serializers.ModelSerializer):
+class DetailAdvertisementsSerializer(
+    SparseFieldsMixin, serializers.ModelSerializer
+):
     """Serializer listing all advertisements."""
 
     city = ListCitySerializer(read_only=True)
     user = CreateUserSerializer(read_only=True)
     images = serializers.SerializerMethodField()
     category = ListCategorySerializer(read_only=True)
+    unique_viewers = serializers.SerializerMethodField()
 
     class Meta:
         model = Advertisement
@@ -146,14 +218,31 @@ class DetailAdvertisementsSerializer(serializers.ModelSerializer):
             "description",
             "price",
             "views",
+            "unique_viewers",
             "user",
             "images",
         )
 
+    def get_unique_viewers(self, obj):
+        """The count the view has already read is passed in the context."""
+
+        if "unique_viewers" in self.context:
+            return self.context["unique_viewers"]
+
+        return views_counter.count_unique_viewers(obj.pk)
+
     def get_images(self, obj):
         """Method for custom serializer field."""
 
-        return ImagesSerializer(obj.images.all(), many=True).data
+        return [
+            {
+                kind.value: get_image_url(
+                    image, self.context.get("request"), kind
+                )
+                for kind in (ImageVariantKind.DETAIL, ImageVariantKind.ZOOM)
+            }
+            for image in obj.images.all()
+        ]
 
 
 class CreateAdvertisementSerializer(serializers.ModelSerializer):
@@ -189,8 +278,14 @@ class CreateAdvertisementSerializer(serializers.ModelSerializer):
 
                 check_image_size(image_content)
 
+                key, size, width, height = get_blob_storage().save(
+                    image_content
+                )
                 AdvertisementImages.objects.create(
-                    image=image_content,
+                    key=key,
+                    size=size,
+                    width=width,
+                    height=height,
                     advertisement=advertisement,
                 )
 
@@ -216,40 +311,6 @@ class CreateAdvertisementCategorySerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class ListAdvertisementCategoriesSerializer(serializers.ModelSerializer):
-    """Serializer listing all advertisement categories."""
-
-    children = serializers.SerializerMethodField()
-
-    class Meta:
-        model = AdvertisementCategory
-        fields = (
-            "name",
-            "children",
-        )
-
-    def get_children(self, obj):
-        """Method for getting categories as tree."""
-
-        def get_children_recursively(category):
-            children = AdvertisementCategory.objects.filter(
-                parent_category=category
-            )
-            child_data = []
-
-            for child in children:
-                child_data.append(
-                    {
-                        "id": child.id,
-                        "name": child.name,
-                        "children": get_children_recursively(child),
-                    }
-                )
-            return child_data
-
-        return get_children_recursively(obj)
-
-
 class ModerationRecordHistorySerializer(serializers.ModelSerializer):
     """Serializer for advertisement moderation history."""
 
@@ -3,6 +3,7 @@ import random
 
 import api.consts as consts
 import requests
+from api.services.blob_storage import get_blob_storage
 
 
 class Avatar:
@@ -29,7 +30,12 @@ class Avatar:
     def set_avatar(self, user) -> None:
         """Set avatar for user."""
 
-        user.avatar = self.get_random_avatar()
+        (
+            user.avatar,
+            user.avatar_size,
+            user.avatar_width,
+            user.avatar_height,
+        ) = get_blob_storage().save(self.get_random_avatar())
         user.save()
 
 
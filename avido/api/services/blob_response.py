@@ -0,0 +1,141 @@
+import re
+
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils.cache import patch_cache_control
+from rest_framework import status
+from rest_framework.request import Request
+
+from api.services.blob_storage import BaseBlobStorage
+
+CHUNK_SIZE = 64 * 1024
+CACHE_MAX_AGE = 365 * 24 * 60 * 60
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+CONTENT_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF8", "image/gif"),
+)
+
+
+def get_content_type(head: bytes) -> str:
+    """Guesses the image type from the first bytes of a blob."""
+
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+
+    for signature, content_type in CONTENT_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+
+    return "application/octet-stream"
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    First and last byte of a single `bytes=` range.
+    `None` means the header is ignored and the whole blob is sent,
+    `ValueError` means the range cannot be satisfied.
+    """
+
+    match = RANGE_PATTERN.fullmatch(header.strip())
+
+    if not match or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+
+    if not first:
+        first, last = max(size - int(last), 0), size - 1
+    else:
+        first, last = int(first), min(int(last or size - 1), size - 1)
+
+    if first > last or first >= size:
+        raise ValueError(header)
+
+    return first, last
+
+
+def iter_blob_range(blob, first: int, last: int):
+    """Reads the bytes between `first` and `last` in chunks."""
+
+    with blob:
+        blob.seek(first)
+        remaining = last - first + 1
+
+        while remaining > 0:
+            chunk = blob.read(min(CHUNK_SIZE, remaining))
+
+            if not chunk:
+                break
+
+            remaining -= len(chunk)
+            yield chunk
+
+
+def build_blob_response(
+    request: Request, storage: BaseBlobStorage, key: str
+) -> HttpResponse:
+    """
+    Streams a blob with caching headers and `Range` support.
+    Blobs are content-addressed, so the key is a strong ETag
+    and the response can be cached forever.
+    """
+
+    etag = f'"{key}"'
+
+    try:
+        size = storage.size(key)
+    except FileNotFoundError:
+        raise Http404
+
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+    else:
+        response = build_content_response(
+            storage.open(key), size, request.headers.get("Range")
+        )
+
+    response["ETag"] = etag
+    response["Accept-Ranges"] = "bytes"
+    patch_cache_control(
+        response, public=True, max_age=CACHE_MAX_AGE, immutable=True
+    )
+
+    return response
+
+
+def build_content_response(blob, size: int, range_header: str | None):
+    """Full or partial content response for an open blob."""
+
+    content_type = get_content_type(blob.read(16))
+    blob.seek(0)
+
+    try:
+        byte_range = parse_range(range_header, size) if range_header else None
+    except ValueError:
+        blob.close()
+        response = HttpResponse(
+            status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        return FileResponse(blob, content_type=content_type)
+
+    first, last = byte_range
+    response = StreamingHttpResponse(
+        iter_blob_range(blob, first, last),
+        status=status.HTTP_206_PARTIAL_CONTENT,
+        content_type=content_type,
+    )
+    response["Content-Range"] = f"bytes {first}-{last}/{size}"
+    response["Content-Length"] = last - first + 1
+
+    return response
@@ -0,0 +1,125 @@
+import hashlib
+import os
+import re
+import tempfile
+from functools import lru_cache
+from io import BytesIO
+from typing import BinaryIO, NamedTuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from PIL import Image, UnidentifiedImageError
+
+KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class BlobInfo(NamedTuple):
+    """What is kept in the database about a stored blob."""
+
+    key: str
+    size: int
+    width: int | None
+    height: int | None
+
+
+def get_image_dimensions(content: bytes) -> tuple[int | None, int | None]:
+    """Width and height of an image, `None` if it is not an image."""
+
+    try:
+        return Image.open(BytesIO(content)).size
+    except (UnidentifiedImageError, OSError):
+        return None, None
+
+
+class BaseBlobStorage:
+    """
+    Content-addressed blob storage.
+    Blobs are keyed by the SHA-256 of their content,
+    so saving the same bytes twice stores them once.
+    """
+
+    def save(self, content: bytes) -> BlobInfo:
+        """Store the content and describe it."""
+
+        key = hashlib.sha256(content).hexdigest()
+
+        if not self.exists(key):
+            self.write(key, content)
+
+        return BlobInfo(key, len(content), *get_image_dimensions(content))
+
+    def read(self, key: str) -> bytes:
+        """Whole content of a blob."""
+
+        with self.open(key) as blob:
+            return blob.read()
+
+    def write(self, key: str, content: bytes) -> None:
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def size(self, key: str) -> int:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class LocalBlobStorage(BaseBlobStorage):
+    """Blob storage in a local directory, sharded by key prefix."""
+
+    def __init__(self, location: str):
+        self.location = location
+
+    def path(self, key: str) -> str:
+        if not KEY_PATTERN.fullmatch(key):
+            raise FileNotFoundError(key)
+
+        return os.path.join(self.location, key[:2], key[2:4], key)
+
+    def write(self, key: str, content: bytes) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(path), delete=False
+        ) as temp_file:
+            temp_file.write(content)
+
+        os.replace(temp_file.name, path)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.path(key), "rb")
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self.path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+
+@lru_cache(maxsize=None)
+def get_blob_storage() -> BaseBlobStorage:
+    """Blob storage configured by the `BLOB_STORAGE` setting."""
+
+    backend = import_string(settings.BLOB_STORAGE["BACKEND"])
+    return backend(**settings.BLOB_STORAGE.get("OPTIONS", {}))
+
+
+@receiver(setting_changed)
+def reset_blob_storage(setting, **kwargs):
+    if setting == "BLOB_STORAGE":
+        get_blob_storage.cache_clear()
@@ -0,0 +1,48 @@
+import hashlib
+from datetime import datetime
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.request import Request
+
+from api.renderers import encode
+
+
+def get_content_etag(data) -> str:
+    """Weak ETag of the representation, whatever it is built from."""
+
+    return f'W/"{hashlib.md5(encode(data)).hexdigest()}"'
+
+
+def get_not_modified_response(
+    request: Request, etag: str, last_modified: datetime | None
+) -> HttpResponse | None:
+    """
+    `304 Not Modified` when the client copy matches the validators,
+    `None` when the response has to be built.
+    """
+
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified and int(last_modified.timestamp()),
+    )
+
+    if response is not None:
+        set_validators(response, etag, last_modified)
+
+    return response
+
+
+def set_validators(
+    response: HttpResponse, etag: str, last_modified: datetime | None
+) -> HttpResponse:
+    """Sends the validators a client revalidates its copy with."""
+
+    response["ETag"] = etag
+
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+
+    return response
@@ -0,0 +1,74 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from rest_framework.request import Request
+
+GENERATION_KEY = "advertisement:list:generation"
+MODIFIED_KEY = "advertisement:list:modified"
+PAGE_KEY = "advertisement:list:{}:{}"
+PAGE_TIMEOUT = 5 * 60
+
+
+class ListCache:
+    """
+    Advertisement list responses cached for anonymous users.
+    Keys carry the list generation, so bumping it on writes
+    makes every cached page stale at once, without deleting keys.
+    Stale pages simply expire.
+    """
+
+    def get_generation(self) -> int:
+        """Current list generation, it only ever grows."""
+
+        cache.add(GENERATION_KEY, 0, timeout=None)
+        return cache.get(GENERATION_KEY, 0)
+
+    def bump(self) -> None:
+        """Start a new generation."""
+
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.add(GENERATION_KEY, 1, timeout=None)
+
+        cache.set(MODIFIED_KEY, datetime.now(timezone.utc), timeout=None)
+
+    def get_last_modified(self) -> datetime | None:
+        """When the current generation started."""
+
+        return cache.get(MODIFIED_KEY)
+
+    def get_etag(self, key: str) -> str:
+        """Weak ETag of a list page, it changes with the generation."""
+
+        return f'W/"{hashlib.md5(key.encode()).hexdigest()}"'
+
+    def get_key(self, request: Request) -> str:
+        """
+        Cache key of a list page.
+        Query params are normalized, so their order and blank values
+        do not split the cache, the host is kept for absolute links.
+        """
+
+        params = sorted(
+            (name, value.strip())
+            for name, values in request.query_params.lists()
+            for value in values
+            if value.strip()
+        )
+        digest = hashlib.sha256(
+            json.dumps([request.build_absolute_uri("/"), params]).encode()
+        ).hexdigest()
+
+        return PAGE_KEY.format(self.get_generation(), digest)
+
+    def get(self, key: str) -> dict | None:
+        return cache.get(key)
+
+    def set(self, key: str, data: dict) -> None:
+        cache.set(key, data, timeout=PAGE_TIMEOUT)
+
+
+list_cache = ListCache()
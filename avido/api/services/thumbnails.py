@@ -0,0 +1,43 @@
+from io import BytesIO
+
+from PIL import Image, ImageOps, features
+
+from advertisement.enums import ImageVariantKind
+
+VARIANT_SIZES = {
+    ImageVariantKind.CARD: (320, 240),
+    ImageVariantKind.DETAIL: (1024, 768),
+    ImageVariantKind.ZOOM: (1500, 1500),
+}
+CROPPED_VARIANTS = (ImageVariantKind.CARD,)
+QUALITY = 80
+
+
+def get_variant_format() -> str:
+    """WebP when Pillow is built with it, JPEG otherwise."""
+
+    return "WEBP" if features.check("webp") else "JPEG"
+
+
+def make_variant(content: bytes, kind: ImageVariantKind) -> bytes:
+    """
+    Encode a resized copy of an image.
+    Card variants are cropped to exactly fill their box,
+    the others are scaled down to fit into it.
+    """
+
+    image_format = get_variant_format()
+    image = ImageOps.exif_transpose(Image.open(BytesIO(content)))
+
+    if image_format == "JPEG" or image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+
+    if kind in CROPPED_VARIANTS:
+        image = ImageOps.fit(image, VARIANT_SIZES[kind])
+    else:
+        image.thumbnail(VARIANT_SIZES[kind])
+
+    output = BytesIO()
+    image.save(output, image_format, quality=QUALITY)
+
+    return output.getvalue()
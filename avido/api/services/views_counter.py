@@ -0,0 +1,187 @@
+import hashlib
+import math
+import time
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from advertisement.models import Advertisement, ViewsBatch
+from api.services.list_cache import list_cache
+
+BUFFER_KEY = "advertisement:views"
+FLUSHING_KEY = "advertisement:views:flushing"
+FLUSH_LOCK_KEY = "advertisement:views:flush-lock"
+FLUSH_LOCK_TIMEOUT = 5 * 60
+BATCH_FIELD = "batch"
+BATCH_RETENTION = timedelta(days=1)
+VIEWERS_KEY = "advertisement:viewers:{}"
+SEEN_KEY = "viewer:{}:seen:{}"
+
+SEEN_WINDOW = 24 * 60 * 60
+SEEN_FILTER_CAPACITY = 2000
+SEEN_FILTER_ERROR_RATE = 0.01
+SEEN_FILTER_BITS = math.ceil(
+    -SEEN_FILTER_CAPACITY * math.log(SEEN_FILTER_ERROR_RATE) / math.log(2) ** 2
+)
+SEEN_FILTER_HASHES = round(
+    SEEN_FILTER_BITS / SEEN_FILTER_CAPACITY * math.log(2)
+)
+
+REGISTER_VIEW_SCRIPT = """
+local seen = 1
+for i = 4, #ARGV do
+    if redis.call("SETBIT", KEYS[1], ARGV[i], 1) == 0 then
+        seen = 0
+    end
+end
+redis.call("EXPIREAT", KEYS[1], ARGV[3])
+redis.call("PFADD", KEYS[2], ARGV[2])
+if seen == 0 then
+    redis.call("HINCRBY", KEYS[3], ARGV[1], 1)
+end
+return 1 - seen
+"""
+
+
+def get_seen_filter_bits(advertisement_id: int) -> list[int]:
+    """Bloom filter positions of an advertisement, by double hashing."""
+
+    digest = hashlib.sha256(str(advertisement_id).encode()).digest()
+    first = int.from_bytes(digest[:8], "big")
+    second = int.from_bytes(digest[8:16], "big") | 1
+
+    return [
+        (first + number * second) % SEEN_FILTER_BITS
+        for number in range(SEEN_FILTER_HASHES)
+    ]
+
+
+class ViewsCounter:
+    """
+    Advertisement views counter.
+    Views are accumulated in a Redis hash and periodically written
+    to the database in batches, so reads never wait on row locks.
+    Every viewer has a fixed-size Bloom filter of the advertisements
+    seen within the current day, sized for `SEEN_FILTER_CAPACITY` of them,
+    and every advertisement a HyperLogLog of its viewers.
+    A filter expires at the end of its day, however much is browsed,
+    so a view is counted once per viewer and day.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._register_view = None
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.Redis.from_url(settings.REDIS_URL)
+
+        return self._client
+
+    def increment(self, advertisement_id: int) -> None:
+        """Count one view of the advertisement."""
+
+        self.client.hincrby(BUFFER_KEY, advertisement_id, 1)
+
+    def register_view(self, advertisement_id: int, viewer: str) -> bool:
+        """
+        Count a view unless the viewer has already seen the advertisement
+        today.
+        Runs as one script, returns whether the view was counted.
+        """
+
+        window = int(time.time()) // SEEN_WINDOW
+
+        if self._register_view is None:
+            self._register_view = self.client.register_script(
+                REGISTER_VIEW_SCRIPT
+            )
+
+        return bool(
+            self._register_view(
+                keys=(
+                    SEEN_KEY.format(viewer, window),
+                    VIEWERS_KEY.format(advertisement_id),
+                    BUFFER_KEY,
+                ),
+                args=(
+                    advertisement_id,
+                    viewer,
+                    (window + 1) * SEEN_WINDOW,
+                    *get_seen_filter_bits(advertisement_id),
+                ),
+            )
+        )
+
+    def count_unique_viewers(self, advertisement_id: int) -> int:
+        """Approximate number of distinct viewers of the advertisement."""
+
+        return self.client.pfcount(VIEWERS_KEY.format(advertisement_id))
+
+    def flush(self) -> int:
+        """
+        Write buffered views to the database.
+        Runs are serialized by a Redis lock, an overlapping one returns.
+        The buffer is renamed before reading, so views counted meanwhile
+        go to a fresh hash. A batch left by an interrupted flush
+        is written first. Every batch gets a key recorded in the database
+        along with its views, so a replay never counts them twice.
+        Cached list pages show views, a written batch makes them stale.
+        Returns the number of updated advertisements.
+        """
+
+        lock = self.client.lock(FLUSH_LOCK_KEY, timeout=FLUSH_LOCK_TIMEOUT)
+
+        if not lock.acquire(blocking=False):
+            return 0
+
+        try:
+            return self._flush()
+        finally:
+            lock.release()
+
+    def _flush(self) -> int:
+        if not self.client.exists(FLUSHING_KEY):
+            try:
+                self.client.rename(BUFFER_KEY, FLUSHING_KEY)
+            except redis.ResponseError:
+                return 0
+
+        self.client.hsetnx(FLUSHING_KEY, BATCH_FIELD, uuid.uuid4().hex)
+        batch = self.client.hgetall(FLUSHING_KEY)
+        key = batch.pop(BATCH_FIELD.encode()).decode()
+        ids_by_increment = defaultdict(list)
+
+        for advertisement_id, views in batch.items():
+            ids_by_increment[int(views)].append(int(advertisement_id))
+
+        with transaction.atomic():
+            _, created = ViewsBatch.objects.get_or_create(key=key)
+
+            if not created:
+                ids_by_increment.clear()
+
+            for views, advertisement_ids in ids_by_increment.items():
+                Advertisement.objects.filter(pk__in=advertisement_ids).update(
+                    views=F("views") + views
+                )
+
+            ViewsBatch.objects.filter(
+                flushed_at__lt=timezone.now() - BATCH_RETENTION
+            ).delete()
+            transaction.on_commit(lambda: self.client.delete(FLUSHING_KEY))
+
+            if ids_by_increment:
+                transaction.on_commit(list_cache.bump)
+
+        return sum(map(len, ids_by_increment.values()))
+
+
+views_counter = ViewsCounter()
@@ -1,4 +1,5 @@
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
 from advertisement.enums import AdvertisementStatus, ModerationDecision
@@ -9,11 +10,60 @@ from advertisement.models import (
     ModerationRecordHistory,
     Region,
 )
+from api.services.views_counter import (
+    BUFFER_KEY,
+    FLUSH_LOCK_KEY,
+    FLUSHING_KEY,
+    SEEN_KEY,
+    VIEWERS_KEY,
+    views_counter,
+)
 from users.db_utils import create_token
 from users.enums import UsersRole, UsersStatus
 from users.models import RegistrationToken, User
 
 
+@pytest.fixture(autouse=True)
+def blob_storage(settings, tmp_path):
+    settings.BLOB_STORAGE = {
+        "BACKEND": "api.services.blob_storage.LocalBlobStorage",
+        "OPTIONS": {"location": str(tmp_path / "blobs")},
+    }
+
+
+@pytest.fixture(autouse=True)
+def search_backend(settings):
+    settings.SEARCH_BACKEND = "advertisement.search.memory.MemorySearchBackend"
+
+
+def clear_views_counter():
+    client = views_counter.client
+
+    for key in (
+        BUFFER_KEY,
+        FLUSHING_KEY,
+        FLUSH_LOCK_KEY,
+        *client.scan_iter(VIEWERS_KEY.format("*")),
+        *client.scan_iter(SEEN_KEY.format("*", "*")),
+    ):
+        client.delete(key)
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+
+
+@pytest.fixture
+def buffered_views():
+    clear_views_counter()
+    yield views_counter
+    clear_views_counter()
+
+
 @pytest.fixture
 def client():
     return APIClient
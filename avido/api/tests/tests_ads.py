@@ -1,16 +1,67 @@
+import json
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
 import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from elasticsearch import NotFoundError, RequestError
 from faker import Faker
+from PIL import Image
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 
 import api.consts as consts
-from advertisement.enums import AdvertisementStatus, ModerationDecision
+from advertisement.enums import (
+    AdvertisementStatus,
+    ImageVariantKind,
+    ModerationDecision,
+)
 from advertisement.models import (
     Advertisement,
     AdvertisementCategory,
+    AdvertisementImages,
+    AdvertisementImageVariant,
     City,
     ModerationRecordHistory,
     Region,
 )
+from advertisement.db_utils import prefetch_for_list, select_for_detail
+from advertisement.search.base import SearchPage
+from advertisement.search.postgres import PostgresSearchBackend
+from advertisement.tasks import generate_image_variants, index_advertisement
+from api.fast_serializers import FastListAdvertisementsSerializer
+from api.management.commands.benchmark_query_plans import (
+    NO_INDEX_SCAN_SQL,
+    Command as BenchmarkQueryPlansCommand,
+)
+from api.pagination import KeysetPagination, encode_cursor
+from api.renderers import ORJSONRenderer
+from api.serializers import (
+    CreateUserSerializer,
+    DetailAdvertisementsSerializer,
+    ListAdvertisementsSerializer,
+)
+from api.services.blob_storage import get_blob_storage
+from api.services.list_cache import list_cache
+from api.services.views_counter import (
+    BUFFER_KEY,
+    FLUSH_LOCK_KEY,
+    SEEN_FILTER_CAPACITY,
+    SEEN_FILTER_ERROR_RATE,
+    SEEN_WINDOW,
+    get_seen_filter_bits,
+)
+from avido import elastic_config
+from avido.celery import ensure_search_index
 
 fake = Faker()
 
@@ -24,6 +75,23 @@ DATA = {
 }
 BASE_URL = "/api/ads"
 BASE_ADS_URL = "/api/ads/advertisements/"
+POSTGRES_SEARCH_BACKEND = "advertisement.search.postgres.PostgresSearchBackend"
+ELASTIC_SEARCH_BACKEND = "advertisement.search.elastic.ElasticsearchBackend"
+MEMORY_SEARCH_BACKEND = "advertisement.search.memory.MemorySearchBackend"
+
+
+@pytest.fixture
+def elastic_backend(settings):
+    """Elasticsearch backend with the client and index tasks mocked."""
+
+    settings.SEARCH_BACKEND = ELASTIC_SEARCH_BACKEND
+
+    with (
+        patch("avido.elastic_config.es") as mock_es,
+        patch("advertisement.search.elastic.index_advertisement"),
+        patch("advertisement.search.elastic.delete_advertisement"),
+    ):
+        yield mock_es
 
 
 @pytest.mark.django_db
@@ -223,7 +291,7 @@ def test_get_advertisement_list(city, category, user, client, user_headers):
 
     assert response.status_code == status.HTTP_200_OK
     assert Advertisement.objects.count() == count_before + 2
-    assert len(response.data) == Advertisement.objects.count() - 1
+    assert len(response.data["results"]) == Advertisement.objects.count() - 1
 
 
 @pytest.mark.django_db
@@ -370,3 +438,1381 @@ def test_delete_moderation_record(client, moderation_record, admin_headers):
 
     assert response.status_code == status.HTTP_204_NO_CONTENT
     assert ModerationRecordHistory.objects.count() == count_before - 1
+
+
+@pytest.mark.django_db
+@patch("advertisement.search.elastic.index_advertisement.delay")
+def test_advertisement_indexed_on_save(
+    mock_index, advertisement, django_capture_on_commit_callbacks, settings
+):
+    """Saving an advertisement schedules its reindex after commit."""
+
+    settings.SEARCH_BACKEND = (
+        "advertisement.search.elastic.ElasticsearchBackend"
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        advertisement.save()
+
+    mock_index.assert_called_once_with(advertisement.pk)
+
+
+@pytest.mark.django_db
+@patch("avido.elastic_config.es")
+def test_index_task_does_not_create_index(mock_es, advertisement):
+    """Indexing writes the document without checking for the index."""
+
+    mock_es.indices.exists_alias.return_value = False
+
+    index_advertisement(advertisement.pk)
+
+    mock_es.index.assert_called_once()
+    mock_es.indices.create.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("backend", "ensured"),
+    [(ELASTIC_SEARCH_BACKEND, True), (MEMORY_SEARCH_BACKEND, False)],
+)
+@patch("avido.elastic_config.ensure_index")
+def test_worker_ensures_search_index(mock_ensure, backend, ensured, settings):
+    """Workers create the index on start when Elasticsearch is used."""
+
+    settings.SEARCH_BACKEND = backend
+
+    ensure_search_index()
+
+    assert mock_ensure.called is ensured
+
+
+@patch("avido.elastic_config.es")
+def test_rebuild_index_creation_errors(mock_es):
+    """Only an existing index is tolerated when creating one."""
+
+    mock_es.indices.get.return_value = {}
+    mock_es.indices.create.side_effect = RequestError(
+        400, "resource_already_exists_exception", {}
+    )
+
+    assert elastic_config.create_rebuild_index() == "advertisements_v1"
+
+    mock_es.indices.create.side_effect = RequestError(
+        400, "mapper_parsing_exception", {}
+    )
+
+    with pytest.raises(RequestError):
+        elastic_config.create_rebuild_index()
+
+
+@pytest.mark.django_db
+@patch("avido.elastic_config.es")
+def test_advertisement_list_does_not_index(mock_es, advertisement, client):
+    """Listing advertisements never writes to the search index."""
+
+    response = client().get(path=BASE_ADS_URL)
+
+    assert response.status_code == status.HTTP_200_OK
+    mock_es.index.assert_not_called()
+    mock_es.indices.create.assert_not_called()
+
+
+@pytest.mark.django_db
+@patch("avido.elastic_config.es")
+@patch("avido.elastic_config.parallel_bulk")
+def test_rebuild_search_index(
+    mock_bulk, mock_es, advertisement, django_assert_num_queries
+):
+    """Rebuild fills a new versioned index and swaps the alias to it."""
+
+    mock_es.indices.get.return_value = {"advertisements_v1": {}}
+    mock_es.indices.get_alias.return_value = {"advertisements_v1": {}}
+    mock_bulk.side_effect = lambda client, actions, **kwargs: (
+        (True, action) for action in actions
+    )
+    out = StringIO()
+
+    with django_assert_num_queries(1):
+        call_command("rebuild_search_index", "--batch-size", "1", stdout=out)
+
+    count = Advertisement.objects.count()
+    alias_update = mock_es.indices.update_aliases.call_args.kwargs["body"]
+    new_alias = {"index": "advertisements_v2", "alias": "advertisements"}
+
+    assert f"Indexed {count}, failed 0" in out.getvalue()
+    assert mock_bulk.call_args.kwargs["chunk_size"] == 1
+    assert {"add": new_alias} in alias_update["actions"]
+    mock_es.indices.delete.assert_called_once_with(
+        index="advertisements_v1", ignore=404
+    )
+
+
+@pytest.mark.django_db
+@patch("avido.elastic_config.es")
+@patch("avido.elastic_config.parallel_bulk")
+def test_rebuild_search_index_without_alias(mock_bulk, mock_es, advertisement):
+    """First rebuild replaces a legacy index named like the missing alias."""
+
+    mock_es.indices.get.return_value = {}
+    mock_es.indices.get_alias.side_effect = NotFoundError(
+        404, "aliases_not_found_exception", {}
+    )
+    mock_es.indices.exists.return_value = True
+    mock_bulk.side_effect = lambda client, actions, **kwargs: (
+        (True, action) for action in actions
+    )
+
+    call_command("rebuild_search_index", stdout=StringIO())
+
+    alias_update = mock_es.indices.update_aliases.call_args.kwargs["body"]
+
+    assert alias_update["actions"] == [
+        {"remove_index": {"index": "advertisements"}},
+        {
+            "remove": {
+                "index": "advertisements_v1",
+                "alias": "advertisements_rebuild",
+            }
+        },
+        {"add": {"index": "advertisements_v1", "alias": "advertisements"}},
+    ]
+    mock_es.indices.delete.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_search_keeps_relevance_order(advertisement, client, elastic_backend):
+    """Search results are returned in the order ranked by the engine."""
+
+    Advertisement.objects.update(status=AdvertisementStatus.ACTIVE.value)
+    ranked = list(
+        Advertisement.objects.order_by("-pk").values_list("pk", "name")
+    )
+
+    with patch(
+        "avido.elastic_config.search_description",
+        return_value=SearchPage([pk for pk, _ in ranked], None),
+    ):
+        response = client().get(path=BASE_ADS_URL, data={"name": "Test"})
+
+    assert [ad["name"] for ad in response.data["results"]] == [
+        name for _, name in ranked
+    ]
+    assert response.data["next"] is None
+
+
+@pytest.mark.django_db
+def test_search_cursor_round_trip(advertisement, client, elastic_backend):
+    """The next link carries an opaque cursor passed back to the engine."""
+
+    state = {"pit": "pit-id", "search_after": [1.5, advertisement.pk]}
+
+    with patch(
+        "avido.elastic_config.search_description",
+        return_value=SearchPage([advertisement.pk], state),
+    ) as mock_search:
+        first_page = client().get(path=BASE_ADS_URL, data={"name": "Test"})
+        client().get(first_page.data["next"])
+
+    assert mock_search.call_args_list[0].kwargs["state"] is None
+    assert mock_search.call_args_list[1].kwargs["state"] == state
+
+
+@patch("avido.elastic_config.supports_point_in_time", return_value=True)
+@patch("avido.elastic_config.es")
+def test_elastic_point_in_time_is_lazy(mock_es, mock_pit):
+    """The first page opens no search context, the next one does."""
+
+    mock_es.open_point_in_time.return_value = {"id": "pit-id"}
+    mock_es.search.return_value = {
+        "hits": {"hits": [{"_source": {"id": 1}, "sort": [1.5, 1]}]}
+    }
+
+    first = elastic_config.search_description("bike", "", size=1)
+
+    mock_es.open_point_in_time.assert_not_called()
+
+    second = elastic_config.search_description(
+        "bike", "", size=1, state=first.state
+    )
+
+    assert first.state == {"search_after": [1.5, 1]}
+    assert second.state == {"pit": "pit-id", "search_after": [1.5, 1]}
+    assert mock_es.search.call_args.kwargs["body"]["search_after"] == [1.5, 1]
+
+
+@patch("avido.elastic_config.supports_point_in_time", return_value=False)
+@patch("avido.elastic_config.es")
+def test_elastic_scroll_is_lazy(mock_es, mock_pit):
+    """The scroll is opened for the second page, skipping the first batch."""
+
+    hits = {"hits": [{"_source": {"id": 1}, "sort": [1.5, 1]}]}
+    mock_es.search.return_value = {"_scroll_id": "opened", "hits": hits}
+    mock_es.scroll.return_value = {"_scroll_id": "scroll-id", "hits": hits}
+
+    first = elastic_config.search_description("bike", "", size=1)
+
+    assert "scroll" not in mock_es.search.call_args.kwargs
+
+    second = elastic_config.search_description(
+        "bike", "", size=1, state=first.state
+    )
+
+    assert second.state == {"scroll": "scroll-id"}
+    mock_es.scroll.assert_called_once_with(scroll_id="opened", scroll="1m")
+
+
+@pytest.mark.django_db
+@patch("avido.elastic_config.supports_point_in_time", return_value=True)
+@patch("avido.elastic_config.es")
+def test_search_with_list_cursor(mock_es, mock_pit, client, settings):
+    """A list cursor reused for a search is rejected, not a server error."""
+
+    settings.SEARCH_BACKEND = ELASTIC_SEARCH_BACKEND
+    cursor = encode_cursor(
+        {"ordering": "-created_at", "key": ["2024-05-01T00:00:00Z", 1]}
+    )
+
+    response = client().get(
+        path=BASE_ADS_URL, data={"name": "Test", "cursor": cursor}
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    mock_es.search.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_search_invalid_cursor(client):
+    """A cursor that cannot be decoded is rejected."""
+
+    response = client().get(
+        path=BASE_ADS_URL, data={"name": "Test", "cursor": "garbage"}
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "ordering, order_by",
+    [("-created_at", ("-created_at", "-pk")), ("price", ("price", "pk"))],
+)
+def test_advertisement_list_keyset_pagination(
+    city, category, user, client, ordering, order_by
+):
+    """Following the next links walks every active ad exactly once."""
+
+    for number in range(5):
+        Advertisement.objects.create(
+            name=f"Ad {number}",
+            description="description",
+            price=100 * (number % 2),
+            status=AdvertisementStatus.ACTIVE.value,
+            category=category,
+            city=city,
+            user=user,
+        )
+
+    names = []
+    url = BASE_ADS_URL
+    params = {"page_size": 2, "ordering": ordering}
+
+    while url:
+        response = client().get(url, data=params)
+        names += [ad["name"] for ad in response.data["results"]]
+        url, params = response.data["next"], None
+
+    assert names == list(
+        Advertisement.objects.order_by(*order_by).values_list("name", flat=True)
+    )
+
+
+@pytest.mark.parametrize(
+    "ordering, value, bound",
+    [
+        ("-created_at", "2024-05-01T00:00:00Z", '"created_at" <='),
+        ("price", "100.0", '"price" >='),
+    ],
+)
+def test_keyset_cursor_is_index_bound(ordering, value, bound):
+    """The cursor condition opens with a range bound usable by the index."""
+
+    queryset = Advertisement.objects.all()
+    after = KeysetPagination.get_after_filter(
+        queryset, {"ordering": ordering, "key": [value, 7]}, ordering
+    )
+    where = str(queryset.filter(after).query).split("WHERE", 1)[1]
+
+    assert where.lstrip(" (").startswith(
+        f'"advertisement_advertisement".{bound}'
+    )
+
+
+@pytest.mark.django_db
+def test_advertisement_list_query_count(city, category, user, client):
+    """Listing a page costs one query for any page size."""
+
+    for number in range(6):
+        ad = Advertisement.objects.create(
+            name=f"Ad {number}",
+            description="description",
+            price=100,
+            status=AdvertisementStatus.ACTIVE.value,
+            category=category,
+            city=city,
+            user=user,
+        )
+        for _ in range(2):
+            key, size, width, height = get_blob_storage().save(b"image")
+            AdvertisementImages.objects.create(
+                key=key, size=size, advertisement=ad
+            )
+
+    query_counts = []
+
+    for page_size in (2, 6):
+        with CaptureQueriesContext(connection) as queries:
+            response = client().get(BASE_ADS_URL, data={"page_size": page_size})
+
+        assert len(response.data["results"]) == page_size
+        query_counts.append(len(queries))
+
+    assert query_counts == [1, 1]
+
+
+@pytest.mark.django_db
+def test_detail_images_are_prefetched(
+    advertisement, buffered_views, django_assert_num_queries
+):
+    """The detail serializer reads images and variants from the prefetch."""
+
+    for number in range(2):
+        image = AdvertisementImages.objects.create(
+            key=f"{number:064x}", size=0, advertisement=advertisement
+        )
+
+        for kind in ImageVariantKind:
+            AdvertisementImageVariant.objects.create(
+                image=image,
+                kind=kind.value,
+                key=f"{kind.value}{number}",
+                size=0,
+                width=0,
+                height=0,
+            )
+
+    fields = DetailAdvertisementsSerializer.Meta.fields
+    request = Request(APIRequestFactory().get(BASE_ADS_URL))
+
+    with django_assert_num_queries(3):
+        instance = select_for_detail(
+            Advertisement.objects.all(),
+            fields,
+            [
+                name
+                for name, field in CreateUserSerializer().fields.items()
+                if not field.write_only
+            ],
+        ).get(pk=advertisement.pk)
+
+    with django_assert_num_queries(0):
+        data = DetailAdvertisementsSerializer(
+            instance, context={"request": request}
+        ).data
+
+    assert [image["detail"] for image in data["images"]] == [
+        f"http://testserver{BASE_URL}/images/detail0/",
+        f"http://testserver{BASE_URL}/images/detail1/",
+    ]
+
+
+@pytest.mark.django_db
+def test_create_advertisement_with_images(
+    city, category, user, client, user_headers
+):
+    """Uploaded images go to the blob storage, rows keep only metadata."""
+
+    image_file = BytesIO()
+    Image.new("RGB", (40, 30)).save(image_file, "PNG")
+    uploads = [
+        SimpleUploadedFile(f"image_{number}.png", image_file.getvalue())
+        for number in range(2)
+    ]
+
+    response = client().post(
+        path=BASE_ADS_URL,
+        data={
+            **DATA,
+            "category": category.id,
+            "city": city.id,
+            "images": uploads,
+        },
+        headers=user_headers,
+    )
+    images = AdvertisementImages.objects.all()
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert {(image.size, image.width, image.height) for image in images} == {
+        (len(image_file.getvalue()), 40, 30)
+    }
+    assert len({image.key for image in images}) == 1
+    assert get_blob_storage().read(images[0].key) == image_file.getvalue()
+
+
+@pytest.mark.django_db
+def test_get_image(client, advertisement):
+    """Images are served by key with caching headers and byte ranges."""
+
+    content = b"\x89PNG\r\n\x1a\n" + b"0123456789"
+    key, size, width, height = get_blob_storage().save(content)
+    AdvertisementImages.objects.create(
+        key=key, size=size, advertisement=advertisement
+    )
+    url = f"{BASE_URL}/images/{key}/"
+
+    response = client().get(url)
+    partial = client().get(url, headers={"Range": "bytes=8-11"})
+    not_modified = client().get(url, headers={"If-None-Match": f'"{key}"'})
+    not_satisfiable = client().get(url, headers={"Range": "bytes=100-"})
+    ad = client().get(f"{BASE_ADS_URL}{advertisement.id}/")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert b"".join(response.streaming_content) == content
+    assert response["Content-Type"] == "image/png"
+    assert response["ETag"] == f'"{key}"'
+    assert "immutable" in response["Cache-Control"]
+    assert partial.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert b"".join(partial.streaming_content) == b"0123"
+    assert partial["Content-Range"] == f"bytes 8-11/{size}"
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_satisfiable.status_code == (
+        status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+    )
+    assert ad.data["images"] == [
+        {"detail": f"http://testserver{url}", "zoom": f"http://testserver{url}"}
+    ]
+
+
+@pytest.mark.django_db
+def test_get_missing_image(client):
+    """Unknown image keys are answered with 404."""
+
+    response = client().get(f"{BASE_URL}/images/{'0' * 64}/")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_generate_image_variants(client, advertisement):
+    """Resized variants are stored and the list serves the card one."""
+
+    image_file = BytesIO()
+    Image.new("RGB", (1200, 900)).save(image_file, "PNG")
+    key, size, width, height = get_blob_storage().save(image_file.getvalue())
+    image = AdvertisementImages.objects.create(
+        key=key,
+        size=size,
+        width=width,
+        height=height,
+        advertisement=advertisement,
+    )
+
+    generate_image_variants(image.pk)
+
+    variants = {
+        variant.kind: (variant.width, variant.height)
+        for variant in image.variants.all()
+    }
+    card = image.variants.get(kind=ImageVariantKind.CARD.value)
+    response = client().get(BASE_ADS_URL)
+
+    assert variants == {
+        "card": (320, 240),
+        "detail": (1024, 768),
+        "zoom": (1200, 900),
+    }
+    assert response.data["results"][0]["image"] == (
+        f"http://testserver{BASE_URL}/images/{card.key}/"
+    )
+
+
+@pytest.mark.django_db
+@patch(
+    "api.management.commands.backfill_image_variants.generate_image_variants"
+)
+def test_backfill_image_variants(mock_task, advertisement):
+    """Images missing any variant are enqueued, batch after batch."""
+
+    images = [
+        AdvertisementImages.objects.create(
+            key=f"{number:064x}", size=0, advertisement=advertisement
+        )
+        for number in range(3)
+    ]
+
+    for image, kinds in zip(
+        images, (ImageVariantKind, [ImageVariantKind.CARD])
+    ):
+        for kind in kinds:
+            AdvertisementImageVariant.objects.create(
+                image=image,
+                kind=kind.value,
+                key=image.key,
+                size=0,
+                width=0,
+                height=0,
+            )
+
+    call_command(
+        "backfill_image_variants", "--batch-size", "1", stdout=StringIO()
+    )
+
+    assert [call.args for call in mock_task.delay.call_args_list] == [
+        (images[1].pk,),
+        (images[2].pk,),
+    ]
+
+
+@pytest.mark.django_db
+def test_advertisement_views_are_buffered(
+    client, advertisement, buffered_views
+):
+    """Views are counted once per session and written on flush."""
+
+    first_visitor, second_visitor = client(), client()
+    url = f"{BASE_ADS_URL}{advertisement.id}/"
+
+    for visitor in (first_visitor, first_visitor, second_visitor):
+        response = visitor.get(url)
+
+    advertisement.refresh_from_db()
+    views_before_flush = advertisement.views
+
+    assert buffered_views.flush() == 1
+    advertisement.refresh_from_db()
+    assert views_before_flush == 0
+    assert response.data["unique_viewers"] == 2
+    assert advertisement.views == 2
+    assert buffered_views.flush() == 0
+
+
+@pytest.mark.django_db
+def test_views_flush_is_not_replayed(
+    advertisement, buffered_views, django_capture_on_commit_callbacks
+):
+    """A batch written before a crash is skipped when the flush reruns."""
+
+    buffered_views.increment(advertisement.pk)
+
+    with django_capture_on_commit_callbacks():
+        assert buffered_views.flush() == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert buffered_views.flush() == 0
+
+    buffered_views.increment(advertisement.pk)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert buffered_views.flush() == 1
+
+    advertisement.refresh_from_db()
+    assert advertisement.views == 2
+
+
+@pytest.mark.django_db
+def test_views_flush_refreshes_list_cache(
+    client, advertisement, buffered_views, django_capture_on_commit_callbacks
+):
+    """Cached list pages are revalidated once flushed views change them."""
+
+    Advertisement.objects.update(status=AdvertisementStatus.ACTIVE.value)
+    visitor = client()
+    page = visitor.get(BASE_ADS_URL)
+    buffered_views.increment(advertisement.pk)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        buffered_views.flush()
+
+    page_again = visitor.get(BASE_ADS_URL, HTTP_IF_NONE_MATCH=page["ETag"])
+
+    assert page_again.status_code == status.HTTP_200_OK
+    assert {ad["name"]: ad["views"] for ad in page_again.data["results"]}[
+        advertisement.name
+    ] == 1
+
+
+@pytest.mark.django_db
+def test_views_flush_runs_alone(advertisement, buffered_views):
+    """A flush started while another one runs leaves the buffer alone."""
+
+    buffered_views.increment(advertisement.pk)
+
+    with buffered_views.client.lock(FLUSH_LOCK_KEY):
+        assert buffered_views.flush() == 0
+
+    assert buffered_views.flush() == 1
+
+
+def test_seen_filter_false_positives():
+    """A filter holding its capacity of ads rarely claims unseen ones."""
+
+    seen = set()
+
+    for advertisement_id in range(SEEN_FILTER_CAPACITY):
+        seen.update(get_seen_filter_bits(advertisement_id))
+
+    unseen = range(SEEN_FILTER_CAPACITY, SEEN_FILTER_CAPACITY + 10000)
+    false_positives = sum(
+        seen.issuperset(get_seen_filter_bits(advertisement_id))
+        for advertisement_id in unseen
+    )
+
+    assert false_positives / len(unseen) < 2 * SEEN_FILTER_ERROR_RATE
+
+
+@pytest.mark.django_db
+def test_seen_filter_window(advertisement, buffered_views):
+    """The same viewer is counted again once the day is over."""
+
+    today = time.time() // SEEN_WINDOW * SEEN_WINDOW
+
+    with patch("api.services.views_counter.time.time", return_value=today):
+        first = buffered_views.register_view(advertisement.pk, "viewer")
+        again = buffered_views.register_view(advertisement.pk, "viewer")
+
+    with patch(
+        "api.services.views_counter.time.time",
+        return_value=today + SEEN_WINDOW,
+    ):
+        next_day = buffered_views.register_view(advertisement.pk, "viewer")
+
+    assert (first, again, next_day) == (True, False, True)
+
+
+@pytest.mark.django_db
+def test_category_tree_is_cached(client, category, django_assert_num_queries):
+    """The tree is built with one query and served from cache afterwards."""
+
+    with django_assert_num_queries(1):
+        response = client().get(f"{BASE_ADS_URL}categories/")
+
+    with django_assert_num_queries(0):
+        cached_response = client().get(f"{BASE_ADS_URL}categories/")
+
+    AdvertisementCategory.objects.create(
+        name="Category 3",
+        slug="category-3",
+        description="description",
+        parent_category=category,
+    )
+    updated_response = client().get(f"{BASE_ADS_URL}categories/")
+
+    assert response.data == cached_response.data
+    assert response.data == [
+        {
+            "name": category.parent_category.name,
+            "children": [
+                {"id": category.id, "name": category.name, "children": []}
+            ],
+        }
+    ]
+    assert updated_response.data[0]["children"][0]["children"][0]["name"] == (
+        "Category 3"
+    )
+
+
+@pytest.mark.django_db
+def test_filter_by_category_subtree(client, city, category, user):
+    """Filtering by a category includes ads of all its subcategories."""
+
+    root = category.parent_category
+    leaf = AdvertisementCategory.objects.create(
+        name="Category 3", slug="category-3", description="description"
+    )
+    leaf.parent_category = category
+    leaf.save()
+    other = AdvertisementCategory.objects.create(
+        name="Other", slug="other", description="description"
+    )
+
+    for ad_category in (root, category, leaf, other):
+        Advertisement.objects.create(
+            name=f"Ad in {ad_category.name}",
+            description="description",
+            price=100,
+            status=AdvertisementStatus.ACTIVE.value,
+            category=ad_category,
+            city=city,
+            user=user,
+        )
+
+    response = client().get(BASE_ADS_URL, data={"category_id": category.id})
+    category.parent_category = other
+    category.save()
+    leaf.refresh_from_db()
+
+    assert leaf.path == f"/{other.id}/{category.id}/{leaf.id}/"
+    assert {ad["name"] for ad in response.data["results"]} == {
+        "Ad in Category 2",
+        "Ad in Category 3",
+    }
+
+
+@pytest.mark.django_db
+def test_filter_by_city_and_text(client, region, category, user, settings):
+    """City names and search text match partly typed words."""
+
+    settings.SEARCH_BACKEND = POSTGRES_SEARCH_BACKEND
+    moscow = City.objects.create(name="Moscow", region=region)
+    kazan = City.objects.create(name="Kazan", region=region)
+
+    for name, city in (("Red bike", moscow), ("Blue bike", kazan)):
+        Advertisement.objects.create(
+            name=name,
+            description="description",
+            price=100,
+            status=AdvertisementStatus.ACTIVE.value,
+            category=category,
+            city=city,
+            user=user,
+        )
+
+    by_city = client().get(BASE_ADS_URL, data={"city": "mosc"})
+    by_name = client().get(BASE_ADS_URL, data={"name": "BIK", "city": "an"})
+
+    assert [ad["name"] for ad in by_city.data["results"]] == ["Red bike"]
+    assert [ad["name"] for ad in by_name.data["results"]] == ["Blue bike"]
+
+
+@pytest.mark.django_db
+def test_postgres_search_ranking(client, city, category, user, settings):
+    """Name matches outrank description matches, pages follow the cursor."""
+
+    settings.SEARCH_BACKEND = POSTGRES_SEARCH_BACKEND
+
+    for name, description in (
+        ("Старый стол", "Продаю велосипеды и самокаты"),
+        ("Горный велосипед", "Почти новый"),
+        ("Диван", "Мягкий"),
+    ):
+        Advertisement.objects.create(
+            name=name,
+            description=description,
+            price=100,
+            status=AdvertisementStatus.ACTIVE.value,
+            category=category,
+            city=city,
+            user=user,
+        )
+
+    first_page = client().get(
+        BASE_ADS_URL,
+        data={"name": "велосипед", "description": "велосипед", "page_size": 1},
+    )
+    second_page = client().get(first_page.data["next"])
+
+    assert [ad["name"] for ad in first_page.data["results"]] == [
+        "Горный велосипед"
+    ]
+    assert [ad["name"] for ad in second_page.data["results"]] == ["Старый стол"]
+    assert second_page.data["next"] is None
+
+
+@pytest.mark.django_db
+def test_memory_search(
+    client, city, category, user, django_capture_on_commit_callbacks
+):
+    """Prefixes and typos match, the index follows saves and deletes."""
+
+    def create(name):
+        return Advertisement.objects.create(
+            name=name,
+            description="description",
+            price=100,
+            status=AdvertisementStatus.ACTIVE.value,
+            category=category,
+            city=city,
+            user=user,
+        )
+
+    def search(query):
+        response = client().get(BASE_ADS_URL, data={"name": query})
+        return [ad["name"] for ad in response.data["results"]]
+
+    create("Горный велосипед")
+    sofa = create("Диван")
+
+    assert search("вело") == ["Горный велосипед"]
+    assert search("велосепед") == ["Горный велосипед"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        sofa.name = "Детский велосипед"
+        sofa.save()
+        create("Велосипедный шлем")
+
+    assert search("дивна") == []
+    assert search("велосипед") == [
+        "Горный велосипед",
+        "Детский велосипед",
+        "Велосипедный шлем",
+    ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        sofa.delete()
+
+    assert search("детский") == []
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "backend", [MEMORY_SEARCH_BACKEND, POSTGRES_SEARCH_BACKEND]
+)
+def test_suggest(backend, client, city, category, user, settings):
+    """Active names completing the prefix come most viewed first, cached."""
+
+    settings.SEARCH_BACKEND = backend
+
+    for name, views, ad_status in (
+        ("Горный велосипед", 5, AdvertisementStatus.ACTIVE.value),
+        ("Велосипедный шлем", 10, AdvertisementStatus.ACTIVE.value),
+        ("Детский велосипед", 50, AdvertisementStatus.DRAFT.value),
+        ("Диван", 100, AdvertisementStatus.ACTIVE.value),
+    ):
+        Advertisement.objects.create(
+            name=name,
+            description="description",
+            price=100,
+            views=views,
+            status=ad_status,
+            category=category,
+            city=city,
+            user=user,
+        )
+
+    response = client().get(f"{BASE_ADS_URL}suggest/", data={"q": " ВЕЛОС"})
+    phrase = client().get(f"{BASE_ADS_URL}suggest/", data={"q": "горный вел"})
+    inside_word = client().get(f"{BASE_ADS_URL}suggest/", data={"q": "лосип"})
+    Advertisement.objects.filter(name="Диван").update(name="Велосипед")
+    cached = client().get(f"{BASE_ADS_URL}suggest/", data={"q": "велос"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [ad["name"] for ad in response.data] == [
+        "Велосипедный шлем",
+        "Горный велосипед",
+    ]
+    assert set(response.data[0]) == {"id", "name"}
+    assert [ad["name"] for ad in phrase.data] == ["Горный велосипед"]
+    assert inside_word.data == []
+    assert cached.data == response.data
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("prefix", ["в", "горный вел"])
+def test_postgres_suggest_uses_words_index(prefix, city, category, user):
+    """Prefixes of any length are looked up in the partial words index."""
+
+    Advertisement.objects.bulk_create(
+        Advertisement(
+            name=name,
+            description="description",
+            price=100,
+            status=AdvertisementStatus.ACTIVE.value,
+            category=category,
+            city=city,
+            user=user,
+        )
+        for name in ["Горный велосипед", *(f"ad {n}" for n in range(2000))]
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE advertisement_advertisement")
+
+    with CaptureQueriesContext(connection) as queries:
+        suggestions = PostgresSearchBackend().suggest(prefix)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN {queries[-1]['sql']}")
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+
+    assert [ad["name"] for ad in suggestions] == ["Горный велосипед"]
+    assert "active_name_words_idx" in plan
+
+
+@pytest.fixture
+def faceted_ads(region, category, user):
+    """Active ads in two cities and a draft that facets never count."""
+
+    moscow = City.objects.create(name="Moscow", region=region)
+    kazan = City.objects.create(name="Kazan", region=region)
+
+    for name, city, price, ad_status in (
+        ("Red bike", moscow, 500, AdvertisementStatus.ACTIVE.value),
+        ("Blue bike", moscow, 3000, AdvertisementStatus.ACTIVE.value),
+        ("Green bike", kazan, 3000, AdvertisementStatus.ACTIVE.value),
+        ("Old bike", kazan, 3000, AdvertisementStatus.DRAFT.value),
+    ):
+        Advertisement.objects.create(
+            name=name,
+            description="description",
+            price=price,
+            status=ad_status,
+            category=category,
+            city=city,
+            user=user,
+        )
+
+    return moscow, kazan
+
+
+def get_price_counts(facets):
+    return [price_range["count"] for price_range in facets["price"]]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", [{}, {"name": "bike"}])
+def test_list_facets(query, client, faceted_ads):
+    """Facets come with the first page, from SQL or from the search engine."""
+
+    moscow, kazan = faceted_ads
+
+    response = client().get(
+        BASE_ADS_URL,
+        data={"facets": "city,price,unknown", "page_size": 2, **query},
+    )
+    next_page = client().get(response.data["next"])
+
+    assert response.data["facets"]["city"] == [
+        {"id": moscow.id, "name": "Moscow", "count": 2},
+        {"id": kazan.id, "name": "Kazan", "count": 1},
+    ]
+    assert get_price_counts(response.data["facets"]) == [1, 2, 0, 0, 0]
+    assert set(response.data["facets"]) == {"city", "price"}
+    assert "facets" not in next_page.data
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "backend", [MEMORY_SEARCH_BACKEND, POSTGRES_SEARCH_BACKEND]
+)
+def test_search_facets_follow_filters(backend, client, faceted_ads, settings):
+    """Searched facets and results only count ads the filters keep."""
+
+    settings.SEARCH_BACKEND = backend
+    moscow, _ = faceted_ads
+
+    response = client().get(
+        BASE_ADS_URL,
+        data={"name": "bike", "price_min": 1000, "facets": "city,price"},
+    )
+
+    assert sorted(ad["name"] for ad in response.data["results"]) == [
+        "Blue bike",
+        "Green bike",
+    ]
+    assert get_price_counts(response.data["facets"]) == [0, 2, 0, 0, 0]
+    assert {
+        facet["name"]: facet["count"]
+        for facet in response.data["facets"]["city"]
+    } == {"Moscow": 1, "Kazan": 1}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "backend", [MEMORY_SEARCH_BACKEND, POSTGRES_SEARCH_BACKEND]
+)
+def test_search_pages_skip_hidden_ads(
+    backend, client, category, city, user, settings
+):
+    """Drafts ranked above active ads do not leave empty pages."""
+
+    settings.SEARCH_BACKEND = backend
+
+    for number, ad_status in enumerate(
+        [AdvertisementStatus.DRAFT.value] * 3
+        + [AdvertisementStatus.ACTIVE.value] * 2
+    ):
+        Advertisement.objects.create(
+            name=f"bike {ad_status} {number}",
+            description="description",
+            price=100,
+            status=ad_status,
+            category=category,
+            city=city,
+            user=user,
+        )
+
+    first_page = client().get(
+        BASE_ADS_URL, data={"name": "bike", "page_size": 2}
+    )
+
+    assert [ad["name"] for ad in first_page.data["results"]] == [
+        "bike active 3",
+        "bike active 4",
+    ]
+    assert first_page.data["next"] is None
+
+
+def test_elastic_search_filters():
+    """Filter lookups become filter clauses of the search query."""
+
+    query = elastic_config.get_search_query(
+        "bike",
+        "",
+        {
+            "price__gte": Decimal("1000"),
+            "price__lte": Decimal("5000.5"),
+            "city_id__in": [1, 2],
+            "category_id__in": [],
+            "status": AdvertisementStatus.ACTIVE.value,
+        },
+    )
+
+    assert query["bool"]["minimum_should_match"] == 1
+    assert query["bool"]["filter"] == [
+        {"range": {"price": {"gte": 1000.0}}},
+        {"range": {"price": {"lte": 5000.5}}},
+        {"terms": {"city": [1, 2]}},
+        {"terms": {"category": []}},
+        {"term": {"status": AdvertisementStatus.ACTIVE.value}},
+    ]
+
+
+@pytest.mark.django_db
+@patch("avido.elastic_config.supports_point_in_time", return_value=True)
+@patch("avido.elastic_config.es")
+def test_elastic_facets(mock_es, mock_pit, faceted_ads):
+    """Aggregations are requested with the first page and named from SQL."""
+
+    moscow, _ = faceted_ads
+    mock_es.open_point_in_time.return_value = {"id": "pit-id"}
+    mock_es.search.return_value = {
+        "hits": {"hits": [{"_source": {"id": 1}, "sort": [1.0, 1]}]},
+        "aggregations": {
+            "facets": {
+                "city": {"buckets": [{"key": moscow.id, "doc_count": 2}]},
+                "price": {
+                    "buckets": [
+                        {"doc_count": count} for count in (1, 2, 0, 0, 0)
+                    ]
+                },
+            }
+        },
+    }
+
+    found = elastic_config.search_description(
+        "bike", "", size=20, facets=("city", "price")
+    )
+
+    aggregations = mock_es.search.call_args.kwargs["body"]["aggs"]["facets"]
+    assert aggregations["filter"] == {"term": {"status": "active"}}
+    assert aggregations["aggs"]["price"]["range"]["ranges"][0] == {"to": 1000}
+    assert found.ids == [1]
+    assert found.facets["city"] == [
+        {"id": moscow.id, "name": "Moscow", "count": 2}
+    ]
+    assert get_price_counts(found.facets) == [1, 2, 0, 0, 0]
+
+
+@pytest.mark.django_db
+def test_anonymous_list_is_cached(
+    client,
+    advertisement,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    """Repeated anonymous pages skip the database until an ad changes."""
+
+    Advertisement.objects.update(status=AdvertisementStatus.ACTIVE.value)
+    first = client().get(BASE_ADS_URL, data={"price_min": 1, "city": ""})
+
+    with django_assert_num_queries(0):
+        cached = client().get(BASE_ADS_URL, data={"price_min": " 1 "})
+
+    with django_capture_on_commit_callbacks(execute=True):
+        advertisement.name = "Renamed"
+        advertisement.save()
+
+    fresh = client().get(BASE_ADS_URL, data={"price_min": 1})
+
+    assert cached.data == first.data
+    assert "Renamed" in [ad["name"] for ad in fresh.data["results"]]
+
+
+@pytest.mark.django_db
+def test_list_cache_follows_listed_ads(
+    advertisement, django_capture_on_commit_callbacks
+):
+    """Only changes of ads shown in public lists start a new generation."""
+
+    draft = Advertisement.objects.get(status=AdvertisementStatus.DRAFT.value)
+
+    def save(ad, **changes):
+        generation = list_cache.get_generation()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for name, value in changes.items():
+                setattr(ad, name, value)
+            ad.save()
+
+        return list_cache.get_generation() > generation
+
+    assert not save(draft, name="Draft edit")
+    assert save(draft, status=AdvertisementStatus.ACTIVE.value)
+    assert save(draft, name="Active edit")
+    assert save(draft, status=AdvertisementStatus.SOLD.value)
+    assert not save(draft, name="Sold edit")
+
+
+@pytest.mark.django_db
+def test_search_pages_after_first_are_not_cached(client, advertisement):
+    """Search cursors may hold an expiring context, so only page one is cached."""
+
+    Advertisement.objects.update(status=AdvertisementStatus.ACTIVE.value)
+    params = {"name": "Test", "page_size": 1}
+
+    with patch("api.views.list_cache.set") as mock_set:
+        first = client().get(BASE_ADS_URL, data=params)
+        client().get(first.data["next"])
+
+    assert first.data["next"] is not None
+    assert mock_set.call_count == 1
+
+
+@pytest.mark.django_db
+def test_conditional_get(
+    client, advertisement, buffered_views, django_capture_on_commit_callbacks
+):
+    """Unchanged detail and list pages are answered with `304`."""
+
+    Advertisement.objects.update(status=AdvertisementStatus.ACTIVE.value)
+    visitor = client()
+    detail_url = f"{BASE_ADS_URL}{advertisement.id}/"
+
+    detail = visitor.get(detail_url)
+    page = visitor.get(BASE_ADS_URL)
+    detail_again = visitor.get(
+        detail_url, HTTP_IF_NONE_MATCH=detail.headers["ETag"]
+    )
+    page_again = visitor.get(
+        BASE_ADS_URL, HTTP_IF_NONE_MATCH=page.headers["ETag"]
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        advertisement.refresh_from_db()
+        advertisement.price = 100
+        advertisement.save()
+
+    detail_changed = visitor.get(
+        detail_url, HTTP_IF_NONE_MATCH=detail.headers["ETag"]
+    )
+    page_changed = visitor.get(
+        BASE_ADS_URL, HTTP_IF_NONE_MATCH=page.headers["ETag"]
+    )
+
+    assert detail.headers["ETag"].startswith('W/"')
+    assert detail_again.status_code == status.HTTP_304_NOT_MODIFIED
+    assert page_again.status_code == status.HTTP_304_NOT_MODIFIED
+    assert detail_changed.status_code == status.HTTP_200_OK
+    assert page_changed.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_detail_etag_follows_representation(
+    client, advertisement, buffered_views
+):
+    """
+    Nested data and new viewers change the ETag, a revalidation
+    is answered without serializing and is not counted as a view.
+    """
+
+    Advertisement.objects.update(status=AdvertisementStatus.ACTIVE.value)
+    visitor, other_visitor = client(), client()
+    detail_url = f"{BASE_ADS_URL}{advertisement.id}/"
+
+    detail = visitor.get(detail_url)
+
+    with patch.object(
+        DetailAdvertisementsSerializer, "to_representation"
+    ) as mock_serialize:
+        revisit = other_visitor.get(
+            detail_url, HTTP_IF_NONE_MATCH=detail["ETag"]
+        )
+
+    views_after_revisit = buffered_views.client.hget(
+        BUFFER_KEY, advertisement.pk
+    )
+    City.objects.filter(pk=advertisement.city_id).update(name="Renamed")
+    renamed = visitor.get(detail_url, HTTP_IF_NONE_MATCH=detail["ETag"])
+    other_view = other_visitor.get(detail_url)
+
+    assert "Last-Modified" not in detail.headers
+    assert revisit.status_code == status.HTTP_304_NOT_MODIFIED
+    mock_serialize.assert_not_called()
+    assert views_after_revisit == b"1"
+    assert renamed.status_code == status.HTTP_200_OK
+    assert renamed.data["city"]["name"] == "Renamed"
+    assert renamed["ETag"] != detail["ETag"]
+    assert other_view.data["unique_viewers"] == 2
+    assert other_view["ETag"] != renamed["ETag"]
+    assert buffered_views.client.hget(BUFFER_KEY, advertisement.pk) == b"2"
+
+
+@pytest.mark.django_db
+def test_sparse_fieldsets(client, advertisement, buffered_views):
+    """Only picked fields are sent and only their columns are loaded."""
+
+    Advertisement.objects.update(status=AdvertisementStatus.ACTIVE.value)
+
+    with CaptureQueriesContext(connection) as queries:
+        page = client().get(BASE_ADS_URL, data={"fields": "name,price,bogus"})
+
+    page_queries = [query["sql"] for query in queries]
+    detail = client().get(
+        f"{BASE_ADS_URL}{advertisement.id}/",
+        data={"omit": "user,images,unique_viewers,description"},
+    )
+
+    assert set(page.data["results"][0]) == {"name", "price"}
+    assert len(page_queries) == 1
+    assert '"description"' not in page_queries[0]
+    assert "advertisement_city" not in page_queries[0]
+    assert set(detail.data) == {
+        "name",
+        "category",
+        "city",
+        "price",
+        "created_at",
+        "updated_at",
+        "views",
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", [{}, {"fields": "image,price,city"}])
+def test_fast_list_serializer(advertisement, params):
+    """The fast list serializer renders the same bytes as the model one."""
+
+    Advertisement.objects.update(status=AdvertisementStatus.ACTIVE.value)
+    second = Advertisement.objects.exclude(pk=advertisement.pk).get()
+
+    for ad in (advertisement, advertisement, second):
+        image_file = BytesIO()
+        Image.new("RGB", (400, 300)).save(image_file, "PNG")
+        key, size, width, height = get_blob_storage().save(
+            image_file.getvalue()
+        )
+        image = AdvertisementImages.objects.create(
+            key=key,
+            size=size,
+            width=width,
+            height=height,
+            advertisement=ad,
+        )
+
+        if ad is advertisement:
+            generate_image_variants(image.pk)
+
+    Advertisement.objects.create(
+        name="No images",
+        category=advertisement.category,
+        city=advertisement.city,
+        price="10.5",
+        description="description",
+        user=advertisement.user,
+        status=AdvertisementStatus.ACTIVE.value,
+    )
+    request = Request(APIRequestFactory().get(BASE_ADS_URL, params))
+    queryset = Advertisement.objects.order_by("pk")
+    fast = FastListAdvertisementsSerializer(request)
+
+    expected = JSONRenderer().render(
+        ListAdvertisementsSerializer(
+            prefetch_for_list(queryset),
+            many=True,
+            context={"request": request},
+        ).data
+    )
+    rendered = JSONRenderer().render(
+        fast.to_representation(fast.get_rows(queryset))
+    )
+
+    assert rendered == expected
+
+
+@pytest.mark.parametrize("media_type", [None, "application/json; indent=4"])
+def test_orjson_renderer(media_type):
+    """orjson renders the same JSON as the default renderer."""
+
+    data = {
+        "price": Decimal("30000.5"),
+        "created_at": datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+        "name": gettext_lazy("Name"),
+        "text": "Строка\u2028",
+        "facets": {1: 2},
+        "results": [None, True, 1.5],
+    }
+
+    rendered = ORJSONRenderer().render(data, media_type)
+    expected = JSONRenderer().render(data, media_type)
+
+    assert rendered == expected
+
+
+@pytest.mark.django_db
+def test_streaming_list(client, region):
+    """Unpaginated lists are streamed in chunks with the same payload."""
+
+    City.objects.bulk_create(
+        City(name=f"City {number}", region=region) for number in range(7)
+    )
+
+    with patch("api.views.STREAM_CHUNK_SIZE", 3):
+        response = client().get(f"{BASE_URL}/advertisements/cities/")
+        chunks = list(response.streaming_content)
+
+    browsable = client().get(
+        f"{BASE_URL}/advertisements/cities/", HTTP_ACCEPT="text/html"
+    )
+    content = b"".join(chunks)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "application/json"
+    assert len(chunks) == 2 + 3
+    assert json.loads(content) == [
+        {"name": city.name, "region": region.pk} for city in City.objects.all()
+    ]
+    assert not browsable.streaming
+
+
+@pytest.mark.django_db
+def test_benchmark_serializers(settings):
+    """The benchmark runs with the production hosts and finds no diff."""
+
+    settings.ALLOWED_HOSTS = ["localhost"]
+    out = StringIO()
+
+    call_command(
+        "benchmark_serializers", "--rows", "5", "--repeat", "1", stdout=out
+    )
+
+    assert "same output" in out.getvalue()
+    assert not Advertisement.objects.exists()
+
+
+@pytest.mark.django_db
+def test_query_plan_baseline_uses_no_index(advertisement):
+    """The baseline reads no index, even where one is all the planner wants."""
+
+    command = BenchmarkQueryPlansCommand(stdout=StringIO())
+
+    for _, queryset in command.get_queries():
+        scans = command.explain(
+            "baseline",
+            queryset,
+            sql=[
+                "SET LOCAL random_page_cost = 0",
+                "SET LOCAL cpu_index_tuple_cost = 0",
+                NO_INDEX_SCAN_SQL,
+            ],
+        )
+
+        assert scans
+        assert not [scan for scan in scans if "Index" in scan]
@@ -7,6 +7,7 @@ from .views import (
     AdvertisementView,
     CityView,
     ConfirmRegistrationView,
+    ImageView,
     ModerationRecordHistoryView,
     PersonalCabinetView,
     RegionView,
@@ -58,6 +59,7 @@ urlpatterns = [
     path("auth/", include("djoser.urls")),
     re_path(r"^auth/", include("djoser.urls.authtoken")),
     path("", include(users_router.urls)),
+    path("ads/images/<str:key>/", ImageView.as_view(), name="image"),
     path("ads/", include(advertisement_router.urls)),
     path(
         "register/confirm/<str:token>",
@@ -1,11 +1,14 @@
+from itertools import islice
 from typing import List, Tuple, Type
 
 from django.db.models import QuerySet
-from django.http import Http404
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.utils.crypto import get_random_string
 from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
 from rest_framework import generics, mixins, serializers, status, viewsets
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import AllowAny, BasePermission, IsAuthenticated
 from rest_framework.request import Request
@@ -16,10 +19,42 @@ from rest_framework.views import APIView
 import api.consts as consts
 import api.serializers as slr
 from advertisement import models
+from advertisement.db_utils import (
+    FACETS,
+    NAMED_RELATIONS,
+    count_facets,
+    filter_in_order,
+    get_category_tree,
+    prefetch_for_list,
+    select_for_detail,
+)
 from advertisement.enums import AdvertisementStatus
 from advertisement.filters import AdvertisementFilter
+from advertisement.search import get_search_backend, get_suggestions
+from advertisement.search.base import (
+    SUGGEST_MAX_SIZE,
+    SUGGEST_SIZE,
+    CursorExpired,
+)
+from api.fast_serializers import FastListAdvertisementsSerializer
+from api.pagination import (
+    CURSOR_QUERY_PARAM,
+    INVALID_CURSOR_MESSAGE,
+    KeysetPagination,
+    decode_cursor,
+    get_next_link,
+)
 from api.permissions import IsStaff, IsStaffOrReadOnly
-from avido.elastic_config import index_advertisement, search_description
+from api.renderers import ORJSONRenderer
+from api.services.blob_response import build_blob_response
+from api.services.blob_storage import get_blob_storage
+from api.services.conditional import (
+    get_content_etag,
+    get_not_modified_response,
+    set_validators,
+)
+from api.services.list_cache import list_cache
+from api.services.views_counter import views_counter
 from users.db_utils import (
     delete_token_for_confirm_email,
     get_user_by_email,
@@ -30,6 +65,37 @@ from users.models import RegistrationToken, UsersStatus
 from users.tasks import get_and_set_random_avatar, send_confirmation_email
 
 
+STREAM_CHUNK_SIZE = 500
+
+
+class StreamingListMixin:
+    """
+    Unpaginated lists are streamed as a JSON array,
+    rows are fetched, serialized and encoded `STREAM_CHUNK_SIZE` at a time.
+    Other renderers, e.g. the browsable API, get the usual response.
+    """
+
+    def list(self, request: Request, *args, **kwargs) -> HttpResponse:
+        renderer = request.accepted_renderer
+
+        if self.paginator is not None or not isinstance(
+            renderer, ORJSONRenderer
+        ):
+            return super().list(request, *args, **kwargs)
+
+        rows = self.filter_queryset(self.get_queryset()).iterator(
+            chunk_size=STREAM_CHUNK_SIZE
+        )
+        chunks = (
+            self.get_serializer(chunk, many=True).data
+            for chunk in iter(lambda: list(islice(rows, STREAM_CHUNK_SIZE)), [])
+        )
+
+        return StreamingHttpResponse(
+            renderer.render_chunks(chunks), content_type=renderer.media_type
+        )
+
+
 class RegistrationView(
     viewsets.GenericViewSet, mixins.CreateModelMixin, mixins.UpdateModelMixin
 ):
@@ -122,12 +188,13 @@ class AdvertisementView(viewsets.GenericViewSet, generics.ListCreateAPIView):
 
     filter_backends = (DjangoFilterBackend,)
     filterset_class = AdvertisementFilter
+    pagination_class = KeysetPagination
 
     def get_queryset(self) -> QuerySet:
         return (
-            models.Advertisement.objects.select_related("user")
+            models.Advertisement.objects.all()
             if self.request.user.is_staff
-            else models.Advertisement.objects.select_related("user").filter(
+            else models.Advertisement.objects.filter(
                 status=AdvertisementStatus.ACTIVE.value
             )
         )
@@ -147,22 +214,145 @@ class AdvertisementView(viewsets.GenericViewSet, generics.ListCreateAPIView):
         )
 
     def list(self, request: Request, *args, **kwargs) -> Response:
-        queryset = self.get_queryset()
+        """
+        Pages for anonymous users are served from the list cache
+        and revalidated by the list generation.
+        """
+
+        if not self.is_cached(request):
+            return self.get_list_response(request)
+
+        cache_key = list_cache.get_key(request)
+        etag = list_cache.get_etag(cache_key)
+        last_modified = list_cache.get_last_modified()
+        not_modified = get_not_modified_response(request, etag, last_modified)
+
+        if not_modified is not None:
+            return not_modified
+
+        data = list_cache.get(cache_key)
+
+        if data is None:
+            data = self.get_list_response(request).data
+            list_cache.set(cache_key, data)
+
+        return set_validators(Response(data), etag, last_modified)
+
+    @staticmethod
+    def is_cached(request: Request) -> bool:
+        """
+        Anonymous pages are cached, except search pages after the first:
+        their cursor holds a search context of the client,
+        which expires long before the cached page would.
+        """
+
+        params = request.query_params
+        is_search = params.get("name") or params.get("description")
+
+        return request.user.is_anonymous and not (
+            is_search and params.get(CURSOR_QUERY_PARAM)
+        )
+
+    def get_list_response(self, request: Request) -> Response:
+        lookups = self.get_filter_lookups()
+        queryset = self.get_queryset().filter(**lookups)
         name_query = request.query_params.get("name", "")
         description_query = request.query_params.get("description", "")
 
-        index_advertisement(queryset)
-
         if name_query or description_query:
-            search_results = search_description(name_query, description_query)
-            found_advertisement_ids = [
-                hit["_source"]["id"] for hit in search_results
-            ]
-            queryset = queryset.filter(pk__in=found_advertisement_ids)
+            return self.search(queryset, name_query, description_query, lookups)
+
+        serializer = FastListAdvertisementsSerializer(request)
+        page = self.paginate_queryset(serializer.get_rows(queryset))
+        response = self.get_paginated_response(
+            serializer.to_representation(page)
+        )
+        facets = self.get_facets()
+
+        if facets and not request.query_params.get(CURSOR_QUERY_PARAM):
+            response.data["facets"] = count_facets(queryset, facets)
+
+        return response
+
+    def get_filter_lookups(self) -> dict:
+        """Lookups of the valid filters, the search backend applies them too."""
+
+        filterset = DjangoFilterBackend().get_filterset(
+            self.request, self.get_queryset(), self
+        )
+
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
 
-        serializer = self.get_serializer(queryset, many=True)
+        return filterset.get_lookups()
 
-        return Response(serializer.data)
+    def get_facets(self) -> List[str]:
+        """Facets listed in the `facets` query param, e.g. `city,price`."""
+
+        return [
+            facet
+            for facet in self.request.query_params.get("facets", "").split(",")
+            if facet in FACETS
+        ]
+
+    def search(
+        self,
+        queryset: QuerySet,
+        name_query: str,
+        description_query: str,
+        lookups: dict,
+    ) -> Response:
+        """
+        Page of full-text search results, paginated by cursor.
+        Facets come from the search engine along with the first page,
+        matches and facets are limited by the filter lookups.
+        Ads hidden from the user are filtered out by the engine as well,
+        so pages are cut from visible ads only.
+        """
+
+        if not self.request.user.is_staff:
+            lookups = {**lookups, "status": AdvertisementStatus.ACTIVE.value}
+
+        try:
+            found = get_search_backend().search(
+                name_query,
+                description_query,
+                size=self.paginator.get_page_size(self.request),
+                state=decode_cursor(self.request),
+                facets=self.get_facets(),
+                filters=lookups,
+            )
+        except CursorExpired:
+            raise NotFound(INVALID_CURSOR_MESSAGE)
+
+        serializer = FastListAdvertisementsSerializer(self.request)
+        data = {
+            "next": get_next_link(self.request, found.state),
+            "results": serializer.to_representation(
+                serializer.get_rows(filter_in_order(queryset, found.ids))
+            ),
+        }
+
+        if found.facets is not None:
+            data["facets"] = found.facets
+
+        return Response(data)
+
+    @action(detail=False, methods=("get",), pagination_class=None)
+    def suggest(self, request: Request) -> Response:
+        """Type-ahead: ids and names of advertisements completing `q`."""
+
+        try:
+            size = int(request.query_params.get("size", SUGGEST_SIZE))
+        except ValueError:
+            size = SUGGEST_SIZE
+
+        return Response(
+            get_suggestions(
+                request.query_params.get("q", ""),
+                size=min(max(size, 1), SUGGEST_MAX_SIZE),
+            )
+        )
 
     def create(self, request: Request, *args, **kwargs) -> Response:
         serializer = self.get_serializer(data=request.data)
@@ -170,7 +360,9 @@ class AdvertisementView(viewsets.GenericViewSet, generics.ListCreateAPIView):
         if serializer.is_valid():
             instance = serializer.save()
             return Response(
-                slr.DetailAdvertisementsSerializer(instance).data,
+                slr.DetailAdvertisementsSerializer(
+                    instance, context=self.get_serializer_context()
+                ).data,
                 status=status.HTTP_201_CREATED,
             )
 
@@ -188,24 +380,129 @@ class AdvertisementDetailView(
     )
     serializer_class = slr.DetailAdvertisementsSerializer
 
+    def get_queryset(self) -> QuerySet:
+        return select_for_detail(
+            self.queryset,
+            self.get_fields(),
+            user_fields=self.get_user_fields(),
+        )
+
+    def get_fields(self) -> tuple:
+        return slr.get_requested_fields(
+            self.request, slr.DetailAdvertisementsSerializer.Meta.fields
+        )
+
+    @staticmethod
+    def get_user_fields() -> list[str]:
+        return [
+            name
+            for name, field in slr.CreateUserSerializer().fields.items()
+            if not field.write_only
+        ]
+
     def get_object(self) -> models.Advertisement | Http404:
-        return get_object_or_404(self.queryset, pk=self.kwargs["pk"])
+        return get_object_or_404(self.get_queryset(), pk=self.kwargs["pk"])
+
+    def get_viewer(self) -> str:
+        """Identifies the viewer by user or, for guests, by session."""
+
+        if self.request.user.is_authenticated:
+            return f"user:{self.request.user.pk}"
+
+        if self.request.session.session_key is None:
+            self.request.session.create()
+
+        return f"session:{self.request.session.session_key}"
+
+    def get_version(self, instance, unique_viewers: int | None) -> list:
+        """
+        Everything the representation is built from, read off the loaded
+        instance and its prefetched relations, without serializing it.
+        """
+
+        fields = self.get_fields()
+        version = [
+            instance.pk,
+            instance.updated_at,
+            instance.views,
+            unique_viewers,
+        ]
+
+        if "user" in fields:
+            version += [
+                getattr(instance.user, name) for name in self.get_user_fields()
+            ]
+
+        for name, columns in NAMED_RELATIONS.items():
+            if name in fields:
+                related = getattr(instance, name)
+                version += [getattr(related, column) for column in columns]
+
+        if "images" in fields:
+            version += [
+                (image.key, [variant.key for variant in image.variants.all()])
+                for image in instance.images.all()
+            ]
+
+        return version
 
     def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        """
+        A fresh client copy gets `304` before the serializer runs.
+        The ETag covers every value the representation shows,
+        nested objects and unique viewers included.
+        A revalidation answered with `304` is not counted as a view.
+        """
+
         instance = self.get_object()
-        serializer = self.get_serializer(instance)
-        viewed_ads = request.session.get("viewed_ads", [])
+        is_counted = "unique_viewers" in self.get_fields()
+        unique_viewers = (
+            views_counter.count_unique_viewers(instance.pk)
+            if is_counted
+            else None
+        )
+        not_modified = get_not_modified_response(
+            request,
+            get_content_etag(self.get_version(instance, unique_viewers)),
+            None,
+        )
+
+        if not_modified is not None:
+            return not_modified
+
+        if instance.user_id != request.user.pk:
+            views_counter.register_view(instance.pk, self.get_viewer())
 
-        if instance.pk not in viewed_ads and instance.user != request.user:
-            instance.views += 1
-            instance.save()
-            viewed_ads.append(instance.pk)
-            request.session["viewed_ads"] = viewed_ads
+            if is_counted:
+                unique_viewers = views_counter.count_unique_viewers(instance.pk)
+
+        serializer = self.get_serializer(
+            instance,
+            context={
+                **self.get_serializer_context(),
+                "unique_viewers": unique_viewers,
+            },
+        )
+
+        return set_validators(
+            Response(serializer.data),
+            get_content_etag(self.get_version(instance, unique_viewers)),
+            None,
+        )
+
+
+class ImageView(APIView):
+    """Streams a stored image by its content key."""
+
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
 
-        return Response(serializer.data)
+    def get(self, request: Request, key: str) -> HttpResponse:
+        return build_blob_response(request, get_blob_storage(), key)
 
 
 class PersonalCabinetView(
+    StreamingListMixin,
     viewsets.GenericViewSet,
     generics.ListAPIView,
     generics.RetrieveAPIView,
@@ -214,7 +511,16 @@ class PersonalCabinetView(
     """ViewSet for get Personal Cabinet."""
 
     def get_queryset(self) -> List[models.Advertisement]:
-        return models.Advertisement.objects.filter(user=self.request.user)
+        return prefetch_for_list(
+            models.Advertisement.objects.filter(user=self.request.user),
+            fields=(
+                slr.get_requested_fields(
+                    self.request, slr.ListAdvertisementsSerializer.Meta.fields
+                )
+                if self.action == "list"
+                else None
+            ),
+        )
 
     def get_serializer_class(
         self,
@@ -248,7 +554,9 @@ class PersonalCabinetView(
         instance = serializer.save()
 
         return Response(
-            slr.DetailAdvertisementsSerializer(instance).data,
+            slr.DetailAdvertisementsSerializer(
+                instance, context=self.get_serializer_context()
+            ).data,
             status=status.HTTP_200_OK,
         )
 
@@ -298,23 +606,16 @@ class AdvertisementCategoryView(
     queryset = models.AdvertisementCategory.objects.filter(parent_category=None)
     permission_classes = (IsStaffOrReadOnly,)
 
-    def get_serializer_class(
-        self,
-    ) -> Type[
-        slr.CreateAdvertisementCategorySerializer
-        | slr.ListAdvertisementCategoriesSerializer
-    ]:
-        return (
-            slr.CreateAdvertisementCategorySerializer
-            if self.request.method in ("POST", "PUT")
-            else slr.ListAdvertisementCategoriesSerializer
-        )
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        return Response(get_category_tree())
 
     def get_object(self) -> PermissionDenied | models.Advertisement:
         return get_object_or_404(self.get_queryset(), pk=self.kwargs["pk"])
 
 
-class RegionView(viewsets.GenericViewSet, generics.ListCreateAPIView):
+class RegionView(
+    StreamingListMixin, viewsets.GenericViewSet, generics.ListCreateAPIView
+):
     """ViewSet for get and create Region."""
 
     serializer_class = slr.CreateRegionSerializer
@@ -322,7 +623,9 @@ class RegionView(viewsets.GenericViewSet, generics.ListCreateAPIView):
     permission_classes = (IsStaffOrReadOnly,)
 
 
-class CityView(viewsets.GenericViewSet, generics.ListCreateAPIView):
+class CityView(
+    StreamingListMixin, viewsets.GenericViewSet, generics.ListCreateAPIView
+):
     """ViewSet for get and create City."""
 
     serializer_class = slr.CreateCitySerializer
@@ -3,9 +3,25 @@ from __future__ import absolute_import
 import os
 
 from celery import Celery
+from celery.signals import worker_ready
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "avido.settings")
 
 app = Celery("avido")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
+
+
+@worker_ready.connect
+def ensure_search_index(**kwargs):
+    """
+    Create the search index once per worker start,
+    so indexing tasks do not check for it on every write.
+    """
+
+    from advertisement.search import get_search_backend
+    from advertisement.search.elastic import ElasticsearchBackend
+    from avido import elastic_config
+
+    if isinstance(get_search_backend(), ElasticsearchBackend):
+        elastic_config.ensure_index()
@@ -1,97 +1,591 @@
+from functools import lru_cache
+
 from django.conf import settings
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch, NotFoundError, RequestError
+from elasticsearch.helpers import parallel_bulk
 
-es = Elasticsearch(
-    [{"host": settings.ES_HOST, "port": settings.ES_PORT, "scheme": "http"}]
+from advertisement.db_utils import FACET_SIZE, PRICE_RANGES, get_facet_names
+from advertisement.enums import AdvertisementStatus
+from advertisement.search.base import (
+    SEARCH_SIZE,
+    SUGGEST_SIZE,
+    CursorExpired,
+    SearchPage,
 )
 
+es = (
+    Elasticsearch(
+        [{"host": settings.ES_HOST, "port": settings.ES_PORT, "scheme": "http"}]
+    )
+    if settings.ES_HOST
+    else None
+)
+
+INDEX_ALIAS = "advertisements"
+REBUILD_ALIAS = "advertisements_rebuild"
+KEEP_ALIVE = "1m"
+SORT = [{"_score": "desc"}, {"id": "asc"}]
+INDEX_EXISTS_ERROR = "resource_already_exists_exception"
+FILTER_FIELDS = {
+    "price": "price",
+    "city_id": "city",
+    "category_id": "category",
+    "status": "status",
+}
+INDEX_ANALYSIS = {
+    "analyzer": {
+        "autocomplete": {
+            "tokenizer": "autocomplete",
+            "filter": ["lowercase"],
+        }
+    },
+    "tokenizer": {
+        "autocomplete": {
+            "type": "edge_ngram",
+            "min_gram": 1,
+            "max_gram": 20,
+            "token_chars": ["letter", "digit"],
+        }
+    },
+}
+INDEX_MAPPINGS = {
+    "properties": {
+        "id": {"type": "long"},
+        "name": {"type": "text", "analyzer": "autocomplete"},
+        "description": {"type": "text", "analyzer": "autocomplete"},
+        "suggest": {"type": "completion"},
+        "status": {"type": "keyword"},
+        "city": {"type": "long"},
+        "category": {"type": "long"},
+        "price": {"type": "double"},
+    }
+}
+
+
+def get_index_name(version: int) -> str:
+    """Name of the physical index for a mapping version."""
+
+    return f"{INDEX_ALIAS}_v{version}"
+
+
+def get_aliased_indices() -> list:
+    """Physical indices the read alias currently points to, if it exists."""
+
+    try:
+        return list(es.indices.get_alias(name=INDEX_ALIAS))
+    except NotFoundError:
+        return []
+
+
+def get_next_index_name() -> str:
+    """Name for the next versioned index."""
+
+    versions = [
+        int(name.rsplit("_v", 1)[1])
+        for name in es.indices.get(index=get_index_name("*"), ignore=404)
+        if name.rsplit("_v", 1)[1].isdigit()
+    ]
+
+    return get_index_name(max(versions, default=0) + 1)
+
+
+def create_index(index_name: str, aliases: dict, bulk_load=False):
+    """
+    Create a physical index, an existing one is kept.
+    With `bulk_load` refresh is disabled and replicas are dropped,
+    `finish_bulk_load` restores them.
+    Other errors, e.g. a rejected mapping, are raised.
+    """
+
+    index_settings = {"analysis": INDEX_ANALYSIS}
 
-def index_advertisement(advertisements):
-    index_name = "advertisements"
-    es.indices.create(
+    if bulk_load:
+        index_settings.update(refresh_interval="-1", number_of_replicas=0)
+
+    try:
+        es.indices.create(
+            index=index_name,
+            body={
+                "settings": index_settings,
+                "mappings": INDEX_MAPPINGS,
+                "aliases": aliases,
+            },
+        )
+    except RequestError as error:
+        if error.error != INDEX_EXISTS_ERROR:
+            raise
+
+
+def ensure_index():
+    """Create the first versioned index behind the alias if needed."""
+
+    if not es.indices.exists_alias(name=INDEX_ALIAS):
+        create_index(get_index_name(1), aliases={INDEX_ALIAS: {}})
+
+
+def create_rebuild_index() -> str:
+    """
+    Create the next versioned index for a full rebuild.
+    It is reachable through the rebuild alias only,
+    so live writes land in it while searches keep using the old index.
+    """
+
+    index_name = get_next_index_name()
+    create_index(index_name, aliases={REBUILD_ALIAS: {}}, bulk_load=True)
+
+    return index_name
+
+
+def finish_bulk_load(index_name: str):
+    """Restore refresh and replicas after a bulk load and refresh once."""
+
+    es.indices.put_settings(
         index=index_name,
         body={
-            "settings": {
-                "analysis": {
-                    "analyzer": {
-                        "autocomplete": {
-                            "tokenizer": "autocomplete",
-                            "filter": ["lowercase"],
+            "index": {
+                "refresh_interval": None,
+                "number_of_replicas": settings.ES_REPLICAS,
+            }
+        },
+    )
+    es.indices.refresh(index=index_name)
+
+
+def swap_alias(index_name: str) -> list:
+    """
+    Atomically point the read alias to `index_name`.
+    A legacy concrete index named like the alias is dropped in the same call.
+    Returns the indices the alias pointed to before.
+    """
+
+    old_indices = get_aliased_indices()
+    actions = [
+        {"remove": {"index": old_index, "alias": INDEX_ALIAS}}
+        for old_index in old_indices
+    ]
+
+    if es.indices.exists(index=INDEX_ALIAS) and not old_indices:
+        actions.append({"remove_index": {"index": INDEX_ALIAS}})
+
+    actions += [
+        {"remove": {"index": index_name, "alias": REBUILD_ALIAS}},
+        {"add": {"index": index_name, "alias": INDEX_ALIAS}},
+    ]
+    es.indices.update_aliases(body={"actions": actions})
+
+    return old_indices
+
+
+def delete_index(index_name: str):
+    """Delete a physical index."""
+
+    es.indices.delete(index=index_name, ignore=404)
+
+
+def get_write_targets() -> list:
+    """Live writes go to the read alias and to a rebuild in progress."""
+
+    targets = [INDEX_ALIAS]
+
+    if es.indices.exists_alias(name=REBUILD_ALIAS):
+        targets.append(REBUILD_ALIAS)
+
+    return targets
+
+
+DOCUMENT_FIELDS = (
+    "id",
+    "name",
+    "description",
+    "status",
+    "city",
+    "category",
+    "price",
+    "views",
+)
+
+
+def get_document(advertisement) -> dict:
+    """
+    Build the search document for an advertisement.
+    It reads `DOCUMENT_FIELDS` only, bulk loads select just these.
+    Only active advertisements are suggested, completing the whole name
+    or any of its later words, the most viewed ones first.
+    """
+
+    document = {
+        "id": advertisement.id,
+        "name": advertisement.name,
+        "description": advertisement.description,
+        "status": advertisement.status,
+        "city": advertisement.city_id,
+        "category": advertisement.category_id,
+        "price": float(advertisement.price),
+    }
+
+    if advertisement.status == AdvertisementStatus.ACTIVE.value:
+        words = advertisement.name.split()
+        document["suggest"] = {
+            "input": [" ".join(words[start:]) for start in range(len(words))],
+            "weight": advertisement.views,
+        }
+
+    return document
+
+
+def index_advertisement(advertisement):
+    """
+    Index a single advertisement.
+    The document is keyed by the advertisement id,
+    so repeated calls overwrite it instead of adding duplicates.
+    """
+
+    for target in get_write_targets():
+        es.index(
+            index=target,
+            id=advertisement.id,
+            document=get_document(advertisement),
+        )
+
+
+def bulk_index_advertisements(
+    advertisements, index_name, chunk_size=500, thread_count=4, queue_size=4
+):
+    """
+    Index advertisements through the `_bulk` API.
+    Several batches are sent concurrently, yields `(ok, info)` per document.
+    Documents are only created, so a newer version written
+    by a live update during the rebuild is never overwritten.
+    """
+
+    actions = (
+        {
+            "_op_type": "create",
+            "_index": index_name,
+            "_id": advertisement.id,
+            "_source": get_document(advertisement),
+        }
+        for advertisement in advertisements
+    )
+
+    yield from parallel_bulk(
+        es,
+        actions,
+        chunk_size=chunk_size,
+        thread_count=thread_count,
+        queue_size=queue_size,
+        raise_on_error=False,
+        raise_on_exception=False,
+    )
+
+
+def delete_advertisement(advertisement_id):
+    """Remove an advertisement from the index."""
+
+    for target in get_write_targets():
+        es.delete(index=target, id=advertisement_id, ignore=404)
+
+
+@lru_cache(maxsize=None)
+def supports_point_in_time() -> bool:
+    """Point in time is available since Elasticsearch 7.10."""
+
+    major, minor = es.info()["version"]["number"].split(".")[:2]
+    return (int(major), int(minor)) >= (7, 10)
+
+
+def get_search_filters(filters) -> list[dict]:
+    """
+    Filter clauses of the lookups returned by `AdvertisementFilter`,
+    exact lookups become a term, `__in` lookups become terms,
+    `__gte` and `__lte` become ranges.
+    """
+
+    clauses = []
+
+    for lookup, value in (filters or {}).items():
+        column, _, operator = lookup.partition("__")
+        field = FILTER_FIELDS[column]
+
+        if not operator:
+            clauses.append({"term": {field: value}})
+        elif operator == "in":
+            clauses.append({"terms": {field: list(value)}})
+        else:
+            clauses.append({"range": {field: {operator: float(value)}}})
+
+    return clauses
+
+
+def get_search_query(name_query, description_query, filters=None) -> dict:
+    """Bool query matching name and description, within the filters."""
+
+    return {
+        "bool": {
+            "filter": get_search_filters(filters),
+            "minimum_should_match": 1,
+            "should": [
+                {
+                    "match": {
+                        "name": {
+                            "query": name_query,
+                            "fuzziness": "auto",
                         }
-                    },
-                    "tokenizer": {
-                        "autocomplete": {
-                            "type": "edge_ngram",
-                            "min_gram": 1,
-                            "max_gram": 20,
-                            "token_chars": ["letter", "digit"],
+                    }
+                },
+                {
+                    "match": {
+                        "description": {
+                            "query": description_query,
+                            "fuzziness": "auto",
                         }
-                    },
-                }
-            },
-            "mappings": {
-                "properties": {
-                    "name": {"type": "text", "analyzer": "autocomplete"},
-                    "description": {"type": "text", "analyzer": "autocomplete"},
+                    }
+                },
+                {"match_phrase": {"name": {"query": name_query, "slop": 6}}},
+                {
+                    "match_phrase": {
+                        "description": {
+                            "query": description_query,
+                            "slop": 6,
+                        }
+                    }
+                },
+            ],
+        }
+    }
+
+
+def get_facet_aggregations(facets) -> dict:
+    """
+    Aggregations counting active advertisements per city and category
+    and per price range, the same buckets as `count_facets`.
+    """
+
+    aggregations = {}
+
+    for facet in facets:
+        if facet == "price":
+            aggregations[facet] = {
+                "range": {
+                    "field": "price",
+                    "ranges": [
+                        {
+                            key: value
+                            for key, value in (("from", low), ("to", high))
+                            if value is not None
+                        }
+                        for low, high in PRICE_RANGES
+                    ],
                 }
-            },
-        },
-        ignore=400,
-    )
+            }
+        else:
+            aggregations[facet] = {
+                "terms": {"field": facet, "size": FACET_SIZE}
+            }
 
-    for advertisement in advertisements:
-        document = {
-            "id": advertisement.id,
-            "name": advertisement.name,
-            "description": advertisement.description,
+    return {
+        "facets": {
+            "filter": {"term": {"status": AdvertisementStatus.ACTIVE.value}},
+            "aggs": aggregations,
         }
-        es.index(index=index_name, document=document)
+    }
+
+
+def get_facet_counts(result, facets) -> dict | None:
+    """Facet counts from the aggregations of a search response."""
+
+    if "aggregations" not in result:
+        return None
+
+    aggregations = result["aggregations"]["facets"]
+    counts = {}
+
+    for facet in facets:
+        buckets = aggregations[facet]["buckets"]
+
+        if facet == "price":
+            counts[facet] = [
+                {"from": low, "to": high, "count": bucket["doc_count"]}
+                for (low, high), bucket in zip(PRICE_RANGES, buckets)
+            ]
+            continue
+
+        names = get_facet_names(facet, [bucket["key"] for bucket in buckets])
+        counts[facet] = [
+            {
+                "id": bucket["key"],
+                "name": names.get(bucket["key"]),
+                "count": bucket["doc_count"],
+            }
+            for bucket in buckets
+        ]
+
+    return counts
+
+
+def search_description(
+    name_query,
+    description_query,
+    size=SEARCH_SIZE,
+    state=None,
+    facets=(),
+    filters=None,
+) -> SearchPage:
+    """
+    One page of ids of the best matching advertisements,
+    most relevant first, and the state to fetch the next page with.
+    The first page is a plain search, facets are aggregated with it.
+    A point in time, or a scroll on servers without point in time
+    support, is only opened once the next page is asked for.
+    Filters narrow the hits and the aggregations alike.
+    """
+
+    query = get_search_query(name_query, description_query, filters)
+
+    try:
+        if state is None:
+            page = first_page(
+                query, size, get_facet_aggregations(facets) if facets else None
+            )
+        elif supports_point_in_time():
+            page = search_after_page(query, size, state)
+        else:
+            page = scroll_page(query, size, state)
+
+    except (NotFoundError, RequestError) as error:
+        if state is not None:
+            raise CursorExpired from error
+        raise
+
+    ids, next_state, result = page
+
+    return SearchPage(ids, next_state, get_facet_counts(result, facets))
+
+
+def get_state_value(state, key: str, kind: type):
+    """Value of a cursor state key, a state of another shape is expired."""
+
+    value = state.get(key) if isinstance(state, dict) else None
+
+    if not isinstance(value, kind) or not value:
+        raise CursorExpired
+
+    return value
+
 
+def first_page(query, size, aggregations=None):
+    """
+    First page ordered by score and id, read without a search context.
+    Its state is the sort key of the last hit.
+    """
+
+    body = {"_source": ["id"], "size": size, "query": query, "sort": SORT}
+
+    if aggregations:
+        body["aggs"] = aggregations
+
+    result = es.search(index=INDEX_ALIAS, body=body)
+    hits = result["hits"]["hits"]
+
+    if len(hits) < size:
+        return get_hit_ids(hits), None, result
+
+    return get_hit_ids(hits), {"search_after": hits[-1]["sort"]}, result
+
+
+def search_after_page(query, size, state):
+    """Page after the state key, over the point in time of the second page."""
+
+    search_after = get_state_value(state, "search_after", list)
+
+    if "pit" in state:
+        pit_id = get_state_value(state, "pit", str)
+    else:
+        pit_id = es.open_point_in_time(
+            index=INDEX_ALIAS, keep_alive=KEEP_ALIVE
+        )["id"]
 
-def search_description(name_query, description_query):
     result = es.search(
-        index="advertisements",
         body={
-            "query": {
-                "bool": {
-                    "should": [
-                        {
-                            "match": {
-                                "name": {
-                                    "query": name_query,
-                                    "fuzziness": "auto",
-                                }
-                            }
-                        },
-                        {
-                            "match": {
-                                "description": {
-                                    "query": description_query,
-                                    "fuzziness": "auto",
-                                }
-                            }
-                        },
-                        {
-                            "match_phrase": {
-                                "name": {"query": name_query, "slop": 6}
-                            }
-                        },
-                        {
-                            "match_phrase": {
-                                "description": {
-                                    "query": description_query,
-                                    "slop": 6,
-                                }
-                            }
-                        },
-                    ]
+            "_source": ["id"],
+            "size": size,
+            "query": query,
+            "pit": {"id": pit_id, "keep_alive": KEEP_ALIVE},
+            "sort": SORT,
+            "search_after": search_after,
+        }
+    )
+    hits = result["hits"]["hits"]
+    pit_id = result.get("pit_id", pit_id)
+
+    if len(hits) < size:
+        es.close_point_in_time(body={"id": pit_id}, ignore=404)
+        return get_hit_ids(hits), None, result
+
+    return (
+        get_hit_ids(hits),
+        {"pit": pit_id, "search_after": hits[-1]["sort"]},
+        result,
+    )
+
+
+def scroll_page(query, size, state):
+    """
+    Page of a scrolled search, used when point in time is unavailable.
+    The scroll is opened for the second page, in the order of the first,
+    its first batch repeats the first page and is skipped.
+    """
+
+    if "scroll" in state:
+        result = es.scroll(
+            scroll_id=get_state_value(state, "scroll", str), scroll=KEEP_ALIVE
+        )
+    else:
+        get_state_value(state, "search_after", list)
+        opened = es.search(
+            index=INDEX_ALIAS,
+            body={
+                "_source": ["id"],
+                "size": size,
+                "query": query,
+                "sort": SORT,
+            },
+            scroll=KEEP_ALIVE,
+        )
+        result = es.scroll(scroll_id=opened["_scroll_id"], scroll=KEEP_ALIVE)
+
+    hits = result["hits"]["hits"]
+
+    if len(hits) < size:
+        es.clear_scroll(scroll_id=result["_scroll_id"], ignore=404)
+        return get_hit_ids(hits), None, result
+
+    return get_hit_ids(hits), {"scroll": result["_scroll_id"]}, result
+
+
+def get_hit_ids(hits) -> list[int]:
+    """Advertisement ids of search hits."""
+
+    return [hit["_source"]["id"] for hit in hits]
+
+
+def suggest_names(prefix, size=SUGGEST_SIZE) -> list[dict]:
+    """Ids and names from the completion suggester."""
+
+    result = es.search(
+        index=INDEX_ALIAS,
+        body={
+            "_source": ["id", "name"],
+            "suggest": {
+                "names": {
+                    "prefix": prefix,
+                    "completion": {"field": "suggest", "size": size},
                 }
             },
         },
     )
 
-    if "hits" in result and "hits" in result["hits"]:
-        return result["hits"]["hits"]
-
-    else:
-        return []
+    return [
+        {"id": option["_source"]["id"], "name": option["_source"]["name"]}
+        for option in result["suggest"]["names"][0]["options"]
+    ]
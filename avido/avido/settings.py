@@ -56,6 +56,10 @@ REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend"
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
 
 SIMPLE_JWT = {
@@ -129,6 +133,15 @@ STATIC_ROOT = os.path.join(BASE_DIR, "static")
 MEDIA_URL = "media/"
 MEDIA_ROOT = "media/"
 
+BLOB_STORAGE = {
+    "BACKEND": "api.services.blob_storage.LocalBlobStorage",
+    "OPTIONS": {
+        "location": os.getenv(
+            "BLOB_STORAGE_ROOT", os.path.join(BASE_DIR, MEDIA_ROOT, "blobs")
+        ),
+    },
+}
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 EMAIL_DOMAIN = os.getenv("EMAIL_DOMAIN")
@@ -146,6 +159,32 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
+CELERY_BEAT_SCHEDULE = {
+    "flush-advertisement-views": {
+        "task": "flush_advertisement_views",
+        "schedule": 30.0,
+    },
+}
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/1")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "avido",
+    }
+}
 
 ES_HOST = os.getenv("ES_HOST")
 ES_PORT = os.getenv("ES_PORT")
+ES_REPLICAS = int(os.getenv("ES_REPLICAS", 1))
+
+SEARCH_BACKEND = os.getenv(
+    "SEARCH_BACKEND",
+    (
+        "advertisement.search.elastic.ElasticsearchBackend"
+        if ES_HOST
+        else "advertisement.search.postgres.PostgresSearchBackend"
+    ),
+)
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_user_avatar"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="avatar_key",
+            field=models.CharField(
+                blank=True, max_length=64, verbose_name="Avatar"
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="avatar_size",
+            field=models.PositiveIntegerField(
+                blank=True, null=True, verbose_name="Avatar size"
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="avatar_width",
+            field=models.PositiveIntegerField(
+                blank=True, null=True, verbose_name="Avatar width"
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="avatar_height",
+            field=models.PositiveIntegerField(
+                blank=True, null=True, verbose_name="Avatar height"
+            ),
+        ),
+    ]
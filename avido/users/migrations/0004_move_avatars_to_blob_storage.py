@@ -0,0 +1,65 @@
+from django.db import migrations
+
+from api.services.blob_storage import get_blob_storage
+
+BATCH_SIZE = 200
+
+
+def move_avatars_to_blob_storage(apps, schema_editor):
+    """Copies avatar bytes to the blob storage batch by batch."""
+
+    User = apps.get_model("users", "User")
+    storage = get_blob_storage()
+    last_pk = 0
+
+    while batch := list(
+        User.objects.filter(pk__gt=last_pk, avatar_key="")
+        .exclude(avatar=b"")
+        .order_by("pk")[:BATCH_SIZE]
+    ):
+        for user in batch:
+            (
+                user.avatar_key,
+                user.avatar_size,
+                user.avatar_width,
+                user.avatar_height,
+            ) = storage.save(bytes(user.avatar))
+
+        User.objects.bulk_update(
+            batch,
+            ("avatar_key", "avatar_size", "avatar_width", "avatar_height"),
+        )
+        last_pk = batch[-1].pk
+
+
+def move_avatars_to_database(apps, schema_editor):
+    """Reads avatar bytes back from the blob storage."""
+
+    User = apps.get_model("users", "User")
+    storage = get_blob_storage()
+    last_pk = 0
+
+    while batch := list(
+        User.objects.filter(pk__gt=last_pk)
+        .exclude(avatar_key="")
+        .order_by("pk")[:BATCH_SIZE]
+    ):
+        for user in batch:
+            user.avatar = storage.read(user.avatar_key)
+
+        User.objects.bulk_update(batch, ("avatar",))
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("users", "0003_user_avatar_blob_fields"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            move_avatars_to_blob_storage, move_avatars_to_database
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0004_move_avatars_to_blob_storage"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="user",
+            name="avatar",
+        ),
+        migrations.RenameField(
+            model_name="user",
+            old_name="avatar_key",
+            new_name="avatar",
+        ),
+    ]
@@ -26,7 +26,16 @@ class User(AbstractUser):
     )
     first_name = models.CharField(_("First name"), max_length=150, blank=False)
     last_name = models.CharField(_("Last name"), max_length=150, blank=False)
-    avatar = models.BinaryField(_("Avatar"), blank=True)
+    avatar = models.CharField(_("Avatar"), max_length=64, blank=True)
+    avatar_size = models.PositiveIntegerField(
+        _("Avatar size"), null=True, blank=True
+    )
+    avatar_width = models.PositiveIntegerField(
+        _("Avatar width"), null=True, blank=True
+    )
+    avatar_height = models.PositiveIntegerField(
+        _("Avatar height"), null=True, blank=True
+    )
     email = models.EmailField(_("Email"), max_length=255, unique=True)
     role = models.CharField(
         _("Role"),